@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则构建各阶段的离线基准测试
+
+用法：
+    python scripts/benchmark.py                          # 1 万 / 10 万 / 100 万条规模
+    python scripts/benchmark.py --sizes 10000 --repeat 5 --output bench.json
+"""
+
+import argparse
+import json
+import sys
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from clashrule.bench import DEFAULT_REPEAT, DEFAULT_SIZES, run_benchmarks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="规则构建各阶段的离线基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="夹具规则数量")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每个阶段重复次数，取最快一次")
+    parser.add_argument("--fixture-dir", type=Path, help="夹具目录，指定后生成的夹具会被保留复用")
+    parser.add_argument("--output", type=Path, help="JSON 结果输出路径，默认打印到标准输出（进度与日志写到标准错误）")
+    args = parser.parse_args()
+
+    # 标准输出只留给 JSON 结果，各阶段进度与下载 / 写出日志改写到标准错误
+    with redirect_stdout(sys.stderr):
+        report = run_benchmarks(tuple(args.sizes), args.repeat, args.fixture_dir)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Wrote benchmark results to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
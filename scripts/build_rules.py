@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建 Clash 规则集
+
+用法：
+    python scripts/build_rules.py              # 构建全部规则集
+    python scripts/build_rules.py BanAD UnBan  # 只构建指定规则集
+    python scripts/build_rules.py BanEasyPrivacy --with-deps  # 连同上游依赖一起构建
+    python scripts/build_rules.py --conflicts fail            # 存在策略冲突时构建失败
+    python scripts/build_rules.py ForeignAI --guard report    # 确认上游确实大幅变化，照常发布
+
+规则集按依赖顺序在同一进程内构建，未参与本次构建的排除源读取本地输出文件。
+"""
+
+import argparse
+from pathlib import Path
+
+from clashrule import RULESETS, run
+from clashrule.conflict import MODES as CONFLICT_MODES, ConflictError
+from clashrule.fetch import MAX_WORKERS, PER_HOST
+from clashrule.guard import MAX_DROP, MAX_GROWTH, MIN_BASELINE, MODES as GUARD_MODES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="构建 Clash 规则集")
+    parser.add_argument("names", nargs="*", help=f"规则集名称，默认全部：{', '.join(RULESETS)}")
+    parser.add_argument("--with-deps", action="store_true", help="同时构建所依赖的排除源规则集")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help=f"并发下载数，默认 {MAX_WORKERS}")
+    parser.add_argument("--per-host", type=int, default=PER_HOST, help=f"单个主机并发下载数，默认 {PER_HOST}")
+    parser.add_argument("--parse-workers", type=int, default=0, help="解析进程数，默认等于 CPU 核数，1 表示不使用进程池")
+    parser.add_argument("--no-cache", action="store_true", help="不使用下载缓存，完整下载全部来源")
+    parser.add_argument("--force", action="store_true", help="上游未变化时也重新生成")
+    parser.add_argument("--full", action="store_true", help="规则未变化时也重写输出文件（刷新头部时间）")
+    parser.add_argument("--report", type=Path, help="运行记录 JSON 路径，默认写在输出目录下的 run_report.json")
+    parser.add_argument(
+        "--conflicts", choices=CONFLICT_MODES, default="report",
+        help="策略冲突检查：report 只写报告（默认），fail 存在冲突时构建失败，off 不检查",
+    )
+    parser.add_argument(
+        "--guard", choices=GUARD_MODES, default="block",
+        help="规则数量异常检查：block 异常时不发布该规则集（默认），report 只写报告，off 不检查",
+    )
+    parser.add_argument("--max-drop", type=float, default=MAX_DROP, help=f"相对历史基线的减少比例上限，默认 {MAX_DROP}")
+    parser.add_argument("--max-growth", type=float, default=MAX_GROWTH, help=f"相对历史基线的增加比例上限，默认 {MAX_GROWTH}")
+    parser.add_argument(
+        "--min-baseline", type=int, default=MIN_BASELINE,
+        help=f"基线低于此值的项只在变为 0 条时视为异常，默认 {MIN_BASELINE}",
+    )
+    args = parser.parse_args()
+
+    unknown = [n for n in args.names if n not in RULESETS]
+    if unknown:
+        parser.error(f"未知规则集：{', '.join(unknown)}")
+
+    try:
+        run(
+            args.names or list(RULESETS),
+            with_deps=args.with_deps,
+            max_workers=args.workers,
+            per_host=args.per_host,
+            use_cache=not args.no_cache,
+            force=args.force,
+            incremental=not args.full,
+            parse_workers=args.parse_workers,
+            report_path=args.report,
+            conflicts=args.conflicts,
+            guard=args.guard,
+            max_drop=args.max_drop,
+            max_growth=args.max_growth,
+            min_baseline=args.min_baseline,
+        )
+    except ConflictError as e:
+        parser.exit(1, f"{e}，详见 .github/tmp/conflict_report.txt\n")
+
+
+if __name__ == "__main__":
+    main()
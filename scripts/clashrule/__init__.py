@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ClashRule_Auto 规则构建库
+
+所有规则集共享同一套 下载 / 解析 / 去重 / 排除 / 写出 流程，
+每个规则集在 config.RULESETS 中以声明式配置描述。
+"""
+
+from .config import RULE_TYPES, RULESETS, Ruleset, Source
+from .models import BuildResult, SourceResult
+from .parse import extract_domain, extract_domains, parse_lines
+from .pipeline import build_ruleset, run
+from .store import STORE, RuleStore, RuleType
+
+__all__ = [
+    "RULE_TYPES",
+    "RULESETS",
+    "Ruleset",
+    "Source",
+    "BuildResult",
+    "SourceResult",
+    "extract_domain",
+    "extract_domains",
+    "parse_lines",
+    "build_ruleset",
+    "run",
+    "STORE",
+    "RuleStore",
+    "RuleType",
+]
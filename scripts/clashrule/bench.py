@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线基准测试
+
+按给定规模生成 DOMAIN / DOMAIN-SUFFIX / DOMAIN-KEYWORD / DOMAIN-REGEX 混合规则，
+分别统计 pipeline 各阶段的耗时，结果以 JSON 输出，便于在每日任务之前发现性能回退。
+下载阶段使用本地 HTTP 服务代替上游，不访问外网。
+"""
+
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Iterator
+
+from .cache import CHUNK_SIZE
+from .compact import compact
+from .config import Ruleset, Source
+from .domainset import domain_entries, encode_mrs
+from .emit import group_rules_by_type, write_ruleset
+from .fetch import Fetcher
+from .models import BuildResult, SourceResult
+from .parallel import ParsePool
+from .parse import ParseSpec, extract_domain, extract_domains, iter_text_lines, parse_lines
+from .pipeline import apply_excludes, make_consumer
+from .regexcheck import RegexChecker, check_regexes
+from .store import STORE, RuleStore
+from .suffix import SuffixIndex
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_REPEAT = 3
+
+_TLDS = ("com", "net", "org", "cn", "io", "xyz", "top", "co.uk")
+_SYLLABLES = ("ad", "ads", "track", "pixel", "cdn", "img", "stat", "log", "api", "m", "ka", "zo", "ri", "tu", "ne", "lo")
+
+
+def _label(rng: random.Random) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))) + str(rng.randint(0, 999))
+
+
+def generate_rules(size: int, seed: int = 0) -> Iterator[str]:
+    """
+    生成 size 条 Clash 规则（另有少量注释行）。
+
+    约 10% 的域名来自同一批根域名，保证后缀覆盖与排除阶段有真实的命中。
+    """
+    rng = random.Random(seed)
+    roots = [f"{_label(rng)}.{rng.choice(_TLDS)}" for _ in range(max(1, size // 50))]
+
+    yield "# UPDATED: 2026-01-01 00:00:00"
+    for i in range(size):
+        if i % 1000 == 0:
+            yield f"# section {i // 1000}"
+
+        if rng.random() < 0.1:
+            domain = f"{_label(rng)}.{rng.choice(roots)}"
+        else:
+            domain = f"{_label(rng)}.{_label(rng)}.{rng.choice(_TLDS)}"
+
+        kind = rng.random()
+        if kind < 0.55:
+            yield f"DOMAIN-SUFFIX,{domain}"
+        elif kind < 0.90:
+            yield f"DOMAIN,{domain}"
+        elif kind < 0.97:
+            yield f"DOMAIN-KEYWORD,{_label(rng)}"
+        else:
+            yield f"DOMAIN-REGEX,^{_label(rng)}[0-9]+\\.{rng.choice(_TLDS)}$"
+
+
+def generate_domain_lines(size: int, seed: int = 0) -> Iterator[str]:
+    """extract_domain 的输入：Clash 规则、纯域名、hosts 与 Adblock 语法混合"""
+    rng = random.Random(seed)
+    for _ in range(size):
+        domain = f"{_label(rng)}.{_label(rng)}.{rng.choice(_TLDS)}"
+        kind = rng.random()
+        if kind < 0.3:
+            yield f"DOMAIN-SUFFIX,{domain}"
+        elif kind < 0.5:
+            yield f"DOMAIN,{domain}"
+        elif kind < 0.8:
+            yield domain
+        elif kind < 0.9:
+            yield f"0.0.0.0 {domain}"
+        elif kind < 0.97:
+            yield f"||{domain}^"
+        else:
+            yield f"! comment {domain}"
+
+
+def ensure_fixtures(directory: Path, size: int, seed: int = 0) -> dict[str, Path]:
+    """生成（或复用）指定规模的夹具文件"""
+    directory.mkdir(parents=True, exist_ok=True)
+    files = {
+        "rules": (directory / f"rules_{size}_{seed}.list", partial(generate_rules, size, seed)),
+        "exclude": (directory / f"exclude_{size}_{seed}.list", partial(generate_rules, size // 2, seed + 1)),
+        "domains": (directory / f"domains_{size}_{seed}.txt", partial(generate_domain_lines, size, seed)),
+    }
+    for path, gen in files.values():
+        if not path.exists():
+            with path.open("w", encoding="utf-8") as f:
+                for line in gen():
+                    f.write(line + "\n")
+    return {name: path for name, (path, _) in files.items()}
+
+
+@contextmanager
+def local_http_server(directory: Path) -> Iterator[str]:
+    """在本地随机端口提供 directory 下的文件，代替上游地址"""
+
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(directory)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _read_file(path: Path) -> tuple[dict[str, None], object]:
+    with path.open("rb") as f:
+        return parse_lines(iter_text_lines(iter(lambda: f.read(CHUNK_SIZE), b"")))
+
+
+def bench_size(size: int, fixture_dir: Path, repeat: int, base_url: str, pool: ParsePool) -> list[dict]:
+    files = ensure_fixtures(fixture_dir, size)
+    lines = files["rules"].read_text(encoding="utf-8").splitlines()
+    domain_text = files["domains"].read_text(encoding="utf-8")
+    domain_lines = domain_text.splitlines()
+    filter_lines = [f"||{domain}^" for domain in extract_domains(domain_text)]
+
+    rules, _ = parse_lines(lines)
+    merged = dict.fromkeys(STORE.add_rules(rules), "Bench")
+    exclude_rules = STORE.add_rules(_read_file(files["exclude"])[0])
+    exclude = SourceResult("Exclude", (str(files["exclude"]),), exclude_rules)
+    exclude.index = SuffixIndex(exclude_rules)
+
+    ruleset = Ruleset(name="Bench", title="Benchmark", output="bench.list", sources=(Source("Bench", ()),))
+    result = BuildResult(ruleset, [SourceResult("Bench", ())], [], merged)
+    out_path = fixture_dir / f"out_{size}.list"
+
+    spec = ParseSpec()
+    rules_url = f"{base_url}/{files['rules'].name}"
+
+    def fetch_and_parse() -> None:
+        with Fetcher() as fetcher:
+            fetcher.fetch_all({rules_url: (rules_url, make_consumer(rules_url, spec))})
+
+    stages: dict[str, tuple[int, Callable[[], object]]] = {
+        "parse_lines": (len(lines), lambda: parse_lines(lines)),
+        "parse_file": (len(lines), lambda: _read_file(files["rules"])),
+        "parse_pool": (len(lines), lambda: pool.parse(spec, lines)),
+        "extract_domain": (len(domain_lines), lambda: [extract_domain(line) for line in domain_lines]),
+        "extract_domains": (len(domain_lines), lambda: extract_domains(domain_text)),
+        "parse_domain": (len(domain_lines), lambda: parse_lines(domain_lines, fmt="domain")),
+        "parse_filter": (len(filter_lines), lambda: parse_lines(filter_lines, fmt="filter")),
+        "intern": (len(rules), lambda: RuleStore().add_rules(rules)),
+        "suffix_index": (len(exclude_rules), lambda: SuffixIndex(exclude_rules)),
+        "regex_check": (len(merged), lambda: check_regexes(merged, RegexChecker())),
+        "compact": (len(merged), lambda: compact(merged)),
+        "exclusion": (len(merged), lambda: apply_excludes(merged, [exclude])),
+        "grouping": (len(merged), lambda: group_rules_by_type(merged)),
+        "write": (len(merged), lambda: write_ruleset(result, path=out_path)),
+        "encode_mrs": (len(merged), lambda: encode_mrs(domain_entries(merged)[0])),
+        "fetch_parse": (len(lines), fetch_and_parse),
+    }
+
+    results = []
+    for stage, (count, fn) in stages.items():
+        seconds = best_of(fn, repeat)
+        results.append({
+            "stage": stage,
+            "size": size,
+            "items": count,
+            "seconds": round(seconds, 6),
+            "items_per_sec": round(count / seconds) if seconds else None,
+        })
+        print(f"{stage:<15} size={size:<8} {seconds:.4f}s", file=sys.stderr)
+    return results
+
+
+def run_benchmarks(
+    sizes: tuple[int, ...] = DEFAULT_SIZES,
+    repeat: int = DEFAULT_REPEAT,
+    fixture_dir: Path | None = None,
+) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = fixture_dir or Path(tmp)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        results = []
+        with local_http_server(directory) as base_url, ParsePool() as pool:
+            for size in sizes:
+                results.extend(bench_size(size, directory, repeat, base_url, pool))
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
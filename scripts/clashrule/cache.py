@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持久化下载缓存
+
+每个地址保存：响应内容、ETag、Last-Modified，以及按解析参数区分的解析结果。
+下次下载时携带 If-None-Match / If-Modified-Since，上游返回 304 时直接复用
+缓存的解析结果。规则集是否需要重新生成由解析后的内容决定（见 manifest.py）。
+
+缓存目录 .github/cache 不提交到仓库，由 workflow 中的 actions/cache 在多次运行间保留。
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from .config import BASE_DIR
+from .parse import iter_text_lines
+from .writer import atomic_open, write_bytes
+
+CACHE_DIR = BASE_DIR / ".github" / "cache"
+
+# 解析逻辑变化时递增，使旧的解析结果失效
+CACHE_VERSION = 1
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class HttpCache:
+    def __init__(self, root: Path = CACHE_DIR):
+        self.root = root
+        self.http_dir = root / "http"
+        self.http_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str, suffix: str) -> Path:
+        return self.http_dir / f"{_digest(url)}{suffix}"
+
+    # -----------------------------
+    # HTTP 响应
+    # -----------------------------
+    def load(self, url: str) -> Optional[CacheEntry]:
+        meta = self._path(url, ".json")
+        if not meta.exists() or not self._path(url, ".body").exists():
+            return None
+        try:
+            data = json.loads(meta.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(url, data.get("etag"), data.get("last_modified"))
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        entry = self.load(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def tee(
+        self,
+        url: str,
+        chunks: Iterable[bytes],
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> Iterator[bytes]:
+        """
+        边转发响应分块边写入缓存。
+
+        只有分块被完整读完时才替换缓存内容并写入 ETag / Last-Modified，
+        中途失败时旧缓存保持不变。
+        """
+        with atomic_open(self._path(url, ".body")) as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        meta = {"url": url, "etag": etag, "last_modified": last_modified}
+        write_bytes(self._path(url, ".json"), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def iter_lines(self, url: str) -> Iterator[str]:
+        """逐行读取缓存内容；只有真正迭代时才打开文件"""
+        with self._path(url, ".body").open("rb") as f:
+            yield from iter_text_lines(iter(lambda: f.read(CHUNK_SIZE), b""))
+
+    # -----------------------------
+    # 解析结果
+    # -----------------------------
+    def _parsed_path(self, url: str, signature: str) -> Path:
+        return self._path(url, f".{_digest(f'{CACHE_VERSION}|{signature}')[:12]}.parsed.json")
+
+    def load_parsed(self, url: str, signature: str) -> Optional[tuple[dict[str, None], Optional[str]]]:
+        path = self._parsed_path(url, signature)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return dict.fromkeys(data["rules"]), data.get("updated")
+
+    def store_parsed(self, url: str, signature: str, rules: Iterable[str], updated: Optional[str]) -> None:
+        data = {"updated": updated, "rules": list(rules)}
+        write_bytes(self._parsed_path(url, signature), json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+
+def config_fingerprint(obj: object) -> str:
+    """规则集配置的指纹，配置变化时强制重新生成"""
+    return _digest(f"{CACHE_VERSION}|{obj!r}")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则压缩
+
+同一规则集内的规则策略相同，按 Clash 匹配语义去掉已被其它规则覆盖的规则，
+匹配结果不变：
+  - exact_under_suffix：DOMAIN 等于或位于某条 DOMAIN-SUFFIX 之下
+  - suffix_under_suffix：DOMAIN-SUFFIX 位于更宽泛的 DOMAIN-SUFFIX 之下
+  - domain_has_keyword：DOMAIN / DOMAIN-SUFFIX 的值包含某条 DOMAIN-KEYWORD，
+    其匹配的域名必然也包含该关键字
+  - keyword_has_keyword：DOMAIN-KEYWORD 包含另一条更短的 DOMAIN-KEYWORD
+
+后缀与关键字都通过 SuffixIndex 查找，不做规则 × 规则的双重循环。
+"""
+
+from typing import Optional
+
+from .store import EXACT, KEYWORD, STORE, SUFFIX, RuleStore
+from .suffix import KeywordIndex, SuffixIndex
+
+REWRITES = {
+    "exact_under_suffix": "DOMAIN 被 DOMAIN-SUFFIX 覆盖",
+    "suffix_under_suffix": "DOMAIN-SUFFIX 被更宽泛的 DOMAIN-SUFFIX 覆盖",
+    "domain_has_keyword": "DOMAIN / DOMAIN-SUFFIX 包含同列表的 DOMAIN-KEYWORD",
+    "keyword_has_keyword": "DOMAIN-KEYWORD 包含更短的 DOMAIN-KEYWORD",
+}
+
+
+def _rewrite(rule_type: int, value: str, index: SuffixIndex, keywords: KeywordIndex) -> Optional[str]:
+    """返回使该规则冗余的改写类别，不冗余时返回 None"""
+    if rule_type == SUFFIX:
+        if index.has_suffix(value, strict=True):
+            return "suffix_under_suffix"
+        if keywords.search(value):
+            return "domain_has_keyword"
+    elif rule_type == EXACT:
+        if index.has_suffix(value):
+            return "exact_under_suffix"
+        if keywords.search(value):
+            return "domain_has_keyword"
+    elif rule_type == KEYWORD:
+        if keywords.shorter_in(value):
+            return "keyword_has_keyword"
+
+    return None
+
+
+def compact(
+    rules: dict[int, str],
+    store: RuleStore = STORE,
+) -> tuple[dict[int, str], dict[str, int], dict[int, str]]:
+    """
+    返回 (保留的规则, 改写类别 -> 移除数量, 因 domain_has_keyword 移除的规则)，
+    只列出实际移除过规则的类别；规则以 ID 表示。
+    域名集合无法表达关键字，第三项在写出 .yaml / .mrs 时仍需保留。
+    """
+    index = SuffixIndex(rules, store)
+    keywords = index.keywords
+    if not index.suffixes and not keywords:
+        return rules, {}, {}
+
+    types, values = store.types, store.values
+    kept: dict[int, str] = {}
+    by_keyword: dict[int, str] = {}
+    stats: dict[str, int] = dict.fromkeys(REWRITES, 0)
+    for r, src in rules.items():
+        reason = _rewrite(types[r], values[r], index, keywords)
+        if reason is None:
+            kept[r] = src
+        else:
+            stats[reason] += 1
+            if reason == "domain_has_keyword":
+                by_keyword[r] = src
+
+    return kept, {k: v for k, v in stats.items() if v}, by_keyword
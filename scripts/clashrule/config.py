@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则集声明式配置
+
+每个输出规则集只需要声明：上游来源、去重排除源、允许的规则类型、
+值过滤方式以及输出排版，解析 / 去重 / 排除 / 写出统一由 pipeline 完成。
+"""
+
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+# 路径配置
+BASE_DIR = Path(__file__).resolve().parents[2]
+TMP_DIR = BASE_DIR / ".github" / "tmp"
+RULESET_DIR = BASE_DIR / "Clash" / "Ruleset"
+
+RULE_TYPES = (
+    "DOMAIN-SUFFIX",
+    "DOMAIN",
+    "DOMAIN-KEYWORD",
+    "DOMAIN-REGEX",
+)
+
+
+@dataclass(frozen=True)
+class Source:
+    """
+    一个上游来源，可包含多个地址（内容合并）。
+
+    fmt:
+      - "clash"：Clash 规则行，按 Ruleset.types 与 value_filter 过滤
+      - "domain"：Clash / 纯域名混合格式，统一转换为 DOMAIN-SUFFIX
+      - "filter"：hosts 文件与 Adblock / AdGuard DNS 过滤规则，直接读取上游过滤列表：
+        "0.0.0.0 example.com" 与纯域名转换为 DOMAIN，"||example.com^" 转换为 DOMAIN-SUFFIX，
+        "@@||example.com^" 例外放行对应域名；带限定作用范围修饰符或无法以域名表达的规则跳过
+    """
+
+    name: str
+    urls: tuple[str, ...]
+    fmt: str = "clash"
+
+
+@dataclass(frozen=True)
+class Ruleset:
+    """
+    一个输出规则集。
+
+    excludes：去重排除源（其它规则集名称），命中的规则不会写入本规则集；
+              同时也是构建依赖，排除源总是先于本规则集构建
+    group：策略分组。客户端以相同策略加载同组的全部规则集，每条规则只保留在组内
+           优先级最高的规则集中：组内先注册的规则集优先，自动追加为后注册规则集的排除源
+    value_filter：
+      - "none"：不额外过滤
+      - "plain"：排除含 "://"、"/"、空格的值
+      - "domain_like"：值必须同时包含 "." 与字母，避免纯 IP
+    layout：
+      - "by_type"：按规则类型分段
+      - "by_source"：按来源分段，靠前的来源优先保留重复规则
+      - "flat"：不分段
+    sort：段内规则按规范顺序排序（与按规则字符串排序一致），输出逐字节稳定；
+          为 False 时保持上游顺序（by_source 总是排序）
+    whitelist：是否按 whitelist/ 目录去掉会误杀白名单域名的规则
+    skip_failed：下载失败时跳过该地址而不是中止构建
+    dump_sources：把每个来源解析出的域名写入 .github/tmp/<来源>.txt
+    domain_set：在 .list 旁同时写出 behavior: domain 的 .yaml 与二进制 .mrs
+    """
+
+    name: str
+    title: str
+    output: str
+    sources: tuple[Source, ...]
+    excludes: tuple[str, ...] = ()
+    group: str = ""
+    types: tuple[str, ...] = RULE_TYPES
+    value_filter: str = "none"
+    layout: str = "by_type"
+    sort: bool = True
+    whitelist: bool = False
+    skip_failed: bool = False
+    dump_sources: bool = False
+    domain_set: bool = True
+
+    @property
+    def output_path(self) -> Path:
+        return RULESET_DIR / self.output
+
+
+ACL4SSR = "https://raw.githubusercontent.com/ACL4SSR/ACL4SSR/master/Clash"
+ACL4SSR_REFS = "https://raw.githubusercontent.com/ACL4SSR/ACL4SSR/refs/heads/master/Clash"
+BLACKMATRIX7 = "https://raw.githubusercontent.com/blackmatrix7/ios_rule_script/master/rule/Clash"
+BLACKMATRIX7_REFS = "https://raw.githubusercontent.com/blackmatrix7/ios_rule_script/refs/heads/master/rule/Clash"
+
+
+def _bm7(name: str) -> str:
+    return f"{BLACKMATRIX7}/{name}/{name}.list"
+
+
+RULESETS: dict[str, Ruleset] = {}
+
+
+def _register(ruleset: Ruleset) -> None:
+    if ruleset.group:
+        earlier = tuple(
+            r.name for r in RULESETS.values()
+            if r.group == ruleset.group and r.name not in ruleset.excludes
+        )
+        ruleset = replace(ruleset, excludes=ruleset.excludes + earlier)
+    RULESETS[ruleset.name] = ruleset
+
+
+# -----------------------------
+# AD 规则（按注册顺序：BanAD > Advertising > AdGuardSDNSFilter > BanProgramAD > BanEasyPrivacy）
+# -----------------------------
+_register(Ruleset(
+    name="BanAD",
+    title="BanAD广告拦截规则",
+    output="AD/BanAD.list",
+    sources=(
+        Source("BanAD", (f"{ACL4SSR_REFS}/BanAD.list",)),
+        Source("BanEasyList", (f"{ACL4SSR_REFS}/BanEasyList.list",)),
+        Source("BanEasyListChina", (f"{ACL4SSR_REFS}/BanEasyListChina.list",)),
+        Source("BanEasyPrivacy", (f"{ACL4SSR_REFS}/BanEasyPrivacy.list",)),
+    ),
+    group="AD",
+    types=("DOMAIN-SUFFIX", "DOMAIN", "DOMAIN-KEYWORD"),
+    value_filter="plain",
+    whitelist=True,
+))
+
+_register(Ruleset(
+    name="Advertising",
+    title="Advertising广告拦截规则",
+    output="AD/Advertising.list",
+    sources=(
+        Source("Advertising", (f"{BLACKMATRIX7_REFS}/Advertising/Advertising.list",)),
+    ),
+    group="AD",
+    whitelist=True,
+))
+
+_register(Ruleset(
+    name="AdGuardSDNSFilter",
+    title="AdGuardSDNSFilter广告拦截规则",
+    output="AD/AdGuardSDNSFilter.list",
+    sources=(
+        Source(
+            "AdGuardSDNSFilter",
+            ("https://adguardteam.github.io/AdGuardSDNSFilter/Filters/filter.txt",),
+            fmt="filter",
+        ),
+    ),
+    group="AD",
+    whitelist=True,
+))
+
+_register(Ruleset(
+    name="BanProgramAD",
+    title="BanProgramAD广告拦截规则",
+    output="AD/BanProgramAD.list",
+    sources=(
+        Source("BanProgramAD", (f"{ACL4SSR}/BanProgramAD.list",)),
+    ),
+    group="AD",
+    value_filter="domain_like",
+    whitelist=True,
+))
+
+_register(Ruleset(
+    name="BanEasyPrivacy",
+    title="BanEasyPrivacy广告拦截规则",
+    output="AD/BanEasyPrivacy.list",
+    sources=(
+        Source("BanEasyPrivacy", (f"{ACL4SSR}/BanEasyPrivacy.list",)),
+    ),
+    group="AD",
+    value_filter="domain_like",
+    whitelist=True,
+))
+
+# -----------------------------
+# AI 规则
+# -----------------------------
+_register(Ruleset(
+    name="ForeignAI",
+    title="Foreign AI 域名合并规则（分类 + 去重）",
+    output="AI/ForeignAI.list",
+    group="AI",
+    sources=(
+        Source("OpenAI", (_bm7("OpenAI"), f"{ACL4SSR}/Ruleset/OpenAI.list"), fmt="domain"),
+        Source("ChatGPT", (_bm7("ChatGPT"), f"{ACL4SSR}/Ruleset/ChatGPT.list"), fmt="domain"),
+        Source("GoogleAI", (_bm7("GoogleAI"),), fmt="domain"),
+        Source("Anthropic", (_bm7("Anthropic"),), fmt="domain"),
+        Source("HuggingFace", (_bm7("HuggingFace"),), fmt="domain"),
+        Source("StabilityAI", (_bm7("StabilityAI"),), fmt="domain"),
+        Source("Midjourney", (_bm7("Midjourney"),), fmt="domain"),
+        Source("RunwayML", (_bm7("RunwayML"),), fmt="domain"),
+        Source("Perplexity", (_bm7("Perplexity"),), fmt="domain"),
+        Source("DeepL", (_bm7("DeepL"),), fmt="domain"),
+        Source(
+            "ForeignAI_Extra",
+            ("https://raw.githubusercontent.com/lightanbaby1131-alt/Online-Clash/refs/heads/main/Ruleset/ForeignAI.list",),
+            fmt="domain",
+        ),
+        Source(
+            "AI_Domains",
+            ("https://raw.githubusercontent.com/ai-collection/ai-domains/main/domains.txt",),
+            fmt="domain",
+        ),
+    ),
+    layout="by_source",
+    skip_failed=True,
+    dump_sources=True,
+))
+
+# -----------------------------
+# 直连规则（LocalAreaNetwork > UnBan）
+# -----------------------------
+_register(Ruleset(
+    name="LocalAreaNetwork",
+    title="LocalAreaNetwork 全球直连规则（自动合并 + 去重）",
+    output="Direct/LocalAreaNetwork.list",
+    group="Direct",
+    sources=(
+        Source(
+            "LocalAreaNetwork",
+            (f"{ACL4SSR}/LocalAreaNetwork.list", f"{BLACKMATRIX7}/Lan/Lan.list"),
+            fmt="domain",
+        ),
+    ),
+    layout="flat",
+    skip_failed=True,
+    dump_sources=True,
+))
+
+_register(Ruleset(
+    name="UnBan",
+    title="UnBan 全球直连规则（自动合并 + 去重）",
+    output="Direct/UnBan.list",
+    group="Direct",
+    sources=(
+        Source(
+            "UnBan",
+            (
+                f"{ACL4SSR}/UnBan.list",
+                f"{BLACKMATRIX7}/Direct/Direct.list",
+                "https://raw.githubusercontent.com/Loyalsoldier/clash-rules/release/direct.txt",
+            ),
+            fmt="domain",
+        ),
+    ),
+    layout="flat",
+    skip_failed=True,
+    dump_sources=True,
+))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+策略冲突检查
+
+不同策略分组（config.Ruleset.group，例如 Direct 与 AD / AI）的规则集由客户端以不同策略加载，
+同一个域名同时命中两组规则时，只有排在前面的规则集生效，另一组的规则被遮蔽：
+  - 一方的 DOMAIN-SUFFIX 等于或覆盖另一方的 DOMAIN / DOMAIN-SUFFIX
+  - 两方有相同的 DOMAIN
+
+把所有规则集的 DOMAIN-SUFFIX 与 DOMAIN 各建一个 值 -> 规则集 的字典，每条规则只需查找
+自身及其父级后缀，总耗时与规则总数 × 域名层级数成正比，不做规则集两两之间的比较。
+DOMAIN-KEYWORD / DOMAIN-REGEX 的覆盖范围无法这样索引，不参与检查。
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable
+
+from .config import RULESETS, TMP_DIR
+from .store import EXACT, STORE, SUFFIX, RuleStore
+from .suffix import parent_suffixes
+from .writer import write_bytes
+
+REPORT_FILE = TMP_DIR / "conflict_report.txt"
+
+MODES = ("report", "fail", "off")
+
+# (覆盖方规则集, 被覆盖方规则集) -> [(覆盖规则 ID, 被覆盖规则 ID)]
+Conflicts = dict[tuple[str, str], list[tuple[int, int]]]
+
+
+class ConflictError(RuntimeError):
+    """mode 为 "fail" 且存在策略冲突时抛出"""
+
+
+def _group(name: str) -> str:
+    return RULESETS[name].group or name
+
+
+def find_conflicts(rulesets: dict[str, Iterable[int]], store: RuleStore = STORE) -> Conflicts:
+    """
+    rulesets：规则集名称 -> 规则 ID。
+
+    同组规则集之间不算冲突。两方 DOMAIN-SUFFIX 的值相同、或两方有相同的 DOMAIN 时互相覆盖，
+    只记录一次，覆盖方取分组名较小的一方。
+    """
+    types, values = store.types, store.values
+
+    suffixes: dict[str, list[tuple[str, int]]] = {}
+    exact: dict[str, list[tuple[str, int]]] = {}
+    for name, ids in rulesets.items():
+        for r in ids:
+            t = types[r]
+            if t == SUFFIX:
+                suffixes.setdefault(values[r], []).append((name, r))
+            elif t == EXACT:
+                exact.setdefault(values[r], []).append((name, r))
+
+    conflicts: Conflicts = {}
+
+    def add(owner: str, rule: int, name: str, r: int, symmetric: bool = False) -> None:
+        group, owner_group = _group(name), _group(owner)
+        if owner_group == group or (symmetric and owner_group > group):
+            return
+        conflicts.setdefault((owner, name), []).append((rule, r))
+
+    for name, ids in rulesets.items():
+        for r in ids:
+            t = types[r]
+            if t != SUFFIX and t != EXACT:
+                continue
+            value = values[r]
+
+            for owner, rule in suffixes.get(value, ()):
+                add(owner, rule, name, r, symmetric=t == SUFFIX)
+            if t == EXACT:
+                for owner, rule in exact.get(value, ()):
+                    add(owner, rule, name, r, symmetric=True)
+            for parent in parent_suffixes(value):
+                for owner, rule in suffixes.get(parent, ()):
+                    add(owner, rule, name, r)
+
+    return conflicts
+
+
+def covered_count(conflicts: Conflicts) -> int:
+    """被覆盖的规则数量：一条规则被多条规则覆盖时只计一次，同一规则出现在多个规则集时分别计数"""
+    return len({(name, r) for (_, name), pairs in conflicts.items() for _, r in pairs})
+
+
+def write_report(conflicts: Conflicts, now: datetime, path: Path = REPORT_FILE, store: RuleStore = STORE) -> None:
+    """按 覆盖方 -> 被覆盖方、覆盖规则列出被遮蔽的规则"""
+    lines = [
+        "# 策略冲突报告",
+        f"# 更新时间：{now.strftime('%Y年%m月%d日 %H:%M')}（北京时间）",
+        "# 不同策略分组的规则集命中同一域名时，客户端中排在前面的规则集生效，另一方的规则被遮蔽",
+        "",
+    ]
+    for owner, name in sorted(conflicts):
+        pairs = conflicts[(owner, name)]
+        count = len({r for _, r in pairs})
+        lines.append(f"## {owner}（{_group(owner)}）覆盖 {name}（{_group(name)}）：{count} 条")
+        covered: dict[int, list[int]] = {}
+        for rule, r in pairs:
+            covered.setdefault(rule, []).append(r)
+        for rule in sorted(covered, key=store.rule):
+            lines.append(store.rule(rule))
+            lines.extend(f"  - {x}" for x in sorted(store.rules(covered[rule])))
+        lines.append("")
+
+    write_bytes(path, "\n".join(lines).encode("utf-8"))
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全局去重索引
+
+同一策略分组（config.Ruleset.group）中的规则集由客户端同时加载，每条规则只应出现在
+组内优先级最高的规则集中。组内靠前的规则集都是靠后规则集的排除源，一次运行中会被
+多个下游反复引用，这里为每个规则集只建立一次规则集合与后缀索引，所有下游共用：
+  - 本次已构建的规则集直接复用内存结果
+  - 未构建的规则集首次被引用时读取本地输出文件，之后不再重复读取
+
+策略冲突检查（conflict.py）同样通过这里取得全部规则集的规则。
+"""
+
+from datetime import datetime
+
+from .config import BASE_DIR, RULESETS
+from .models import BuildResult, SourceResult
+from .parse import parse_lines
+from .store import STORE
+from .suffix import SuffixIndex
+
+
+class DedupeIndex:
+    """built 与 pipeline.run 共用同一个 dict，构建完成的规则集登记后立即对下游可见"""
+
+    def __init__(self, built: dict[str, BuildResult], now: datetime):
+        self.built = built
+        self.now = now
+        self._loaded: dict[str, SourceResult] = {}
+
+    def source(self, name: str) -> SourceResult:
+        """以排除源的形式取得规则集 name 的规则与后缀索引"""
+        if name in self.built:
+            result = self.built[name]
+            if result.index is None:
+                result.index = SuffixIndex(result.rules)
+            label = RULESETS[name].output_path.relative_to(BASE_DIR).as_posix()
+            updated = f"{self.now.strftime('%Y年%m月%d日 %H:%M')}（北京时间）"
+            return SourceResult(name, (label,), result.rules, updated, result.index)
+
+        loaded = self._load(name)
+        if loaded.index is None:
+            loaded.index = SuffixIndex(loaded.rules)
+        return loaded
+
+    def rules(self, name: str) -> dict:
+        """规则集 name 的规则 ID 集合，不建立后缀索引"""
+        if name in self.built:
+            return self.built[name].rules
+        return self._load(name).rules
+
+    def _load(self, name: str) -> SourceResult:
+        loaded = self._loaded.get(name)
+        if loaded is not None:
+            return loaded
+
+        path = RULESETS[name].output_path
+        label = path.relative_to(BASE_DIR).as_posix()
+        if not path.exists():
+            raise FileNotFoundError(f"排除源 {name} 未构建，且本地不存在 {label}")
+
+        with path.open("r", encoding="utf-8", errors="ignore") as f:
+            rules, updated = parse_lines(f)
+        loaded = self._loaded[name] = SourceResult(name, (label,), STORE.add_rules(rules), updated)
+        return loaded
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+behavior: domain 规则集（.yaml 与 mihomo 二进制 .mrs）
+
+与 .list 由同一份内存中的规则生成：
+  - DOMAIN,example.com         -> example.com
+  - DOMAIN-SUFFIX,example.com  -> +.example.com（同时匹配自身与全部子域名）
+  - DOMAIN-KEYWORD / DOMAIN-REGEX 及含非法字符的域名无法用域名集合表达，不写入，数量记录在 .yaml 头部
+  - 只因 DOMAIN-KEYWORD 覆盖而未写入 .list 的域名（BuildResult.keyword_covered）照常写入，
+    否则客户端加载域名集合时这些域名不再命中
+
+.mrs 与 mihomo convert-ruleset 的输出格式一致：zstd 压缩的
+"MRS\\x01" + 行为 + 条目数 + 附加数据，之后是倒序域名构成的 succinct trie
+（leaves / labelBitmap / labels）。路由器加载时无需逐行解析文本。
+trie 中的 "+.example.com" 只匹配子域名，与 mihomo 自身的转换一样，每个后缀条目同时写入
+"example.com" 本身（见 mrs_keys）。
+
+.mrs 需要 zstandard（Python 3.14 起可用标准库 compression.zstd），缺少时只写出 .yaml。
+"""
+
+import re
+import struct
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+try:
+    from compression import zstd as _zstd  # type: ignore
+
+    def _compress(data: bytes) -> bytes:
+        return _zstd.compress(data, level=19)
+except ImportError:
+    try:
+        import zstandard as _zstd  # type: ignore
+
+        def _compress(data: bytes) -> bytes:
+            return _zstd.ZstdCompressor(level=19).compress(data)
+    except ImportError:
+        _compress = None  # type: ignore
+
+from .models import BuildResult
+from .store import EXACT, STORE, SUFFIX, RuleStore
+from .writer import atomic_open, write_bytes, write_lines
+
+MRS_MAGIC = b"MRS\x01"
+MRS_BEHAVIOR_DOMAIN = 0
+DOMAIN_SET_VERSION = 1
+
+_LABELS_RE = re.compile(r"^[a-z0-9_-]+(?:\.[a-z0-9_-]+)*$")
+
+
+def domain_entries(rules: Iterable[int], store: RuleStore = STORE) -> tuple[list[str], int]:
+    """返回 (排序后的域名集合条目, 无法转换的规则数量)；rules 为规则 ID"""
+    entries: set[str] = set()
+    skipped = 0
+    types, values = store.types, store.values
+    for r in rules:
+        rule_type, value = types[r], values[r]
+        if (rule_type != SUFFIX and rule_type != EXACT) or not _LABELS_RE.match(value):
+            skipped += 1
+            continue
+        entries.add(f"+.{value}" if rule_type == SUFFIX else value)
+    return sorted(entries), skipped
+
+
+def _pack_bits(bits: bytearray, words: int) -> bytes:
+    """LSB 优先的位图按 uint64 大端写出，与 Go 中 []uint64 的 binary.Write 一致"""
+    bits = bits[: words * 8].ljust(words * 8, b"\0")
+    return struct.pack(f">{words}Q", *struct.unpack(f"<{words}Q", bits))
+
+
+def _set_bit(bits: bytearray, i: int) -> None:
+    if (i >> 3) >= len(bits):
+        bits.extend(b"\0" * ((i >> 3) - len(bits) + 1))
+    bits[i >> 3] |= 1 << (i & 7)
+
+
+def encode_domain_set(entries: Iterable[str]) -> bytes:
+    """
+    按 mihomo DomainSet 的构造方式生成 succinct trie 并序列化。
+
+    每条目先整体倒序（"+.example.com" -> "moc.elpmaxe.+"），排序后按列广度优先展开：
+    每个节点的子标签依次写入 labels 并在 labelBitmap 中记 0，节点结束记 1；
+    节点本身是某条目的结尾时在 leaves 中置位。
+    """
+    keys = sorted(e[::-1] for e in entries)
+    if not keys:
+        return b""
+
+    leaves = bytearray()
+    label_bitmap = bytearray()
+    labels = bytearray()
+    label_index = 0
+    max_leaf = -1
+
+    # 只保留待展开的一层节点，已展开的节点只需要其序号 i
+    queue = deque([(0, len(keys), 0)])
+    i = 0
+    while queue:
+        start, end, col = queue.popleft()
+        if col == len(keys[start]):
+            start += 1
+            _set_bit(leaves, i)
+            max_leaf = i
+
+        j = start
+        while j < end:
+            frm = j
+            c = keys[frm][col]
+            while j < end and keys[j][col] == c:
+                j += 1
+            queue.append((frm, j, col + 1))
+            labels.append(ord(c))
+            label_index += 1
+        _set_bit(label_bitmap, label_index)
+        label_index += 1
+        i += 1
+
+    leaf_words = (max_leaf >> 6) + 1 if max_leaf >= 0 else 0
+    bitmap_words = ((label_index - 1) >> 6) + 1
+
+    return b"".join((
+        bytes((DOMAIN_SET_VERSION,)),
+        struct.pack(">q", leaf_words),
+        _pack_bits(leaves, leaf_words),
+        struct.pack(">q", bitmap_words),
+        _pack_bits(label_bitmap, bitmap_words),
+        struct.pack(">q", len(labels)),
+        bytes(labels),
+    ))
+
+
+def mrs_keys(entries: Iterable[str]) -> list[str]:
+    """域名集合条目 -> succinct trie 的键："+.example.com" 展开为本身与 "example.com"，其余条目不变"""
+    keys = set()
+    for e in entries:
+        keys.add(e)
+        if e.startswith("+."):
+            keys.add(e[2:])
+    return sorted(keys)
+
+
+def encode_mrs(entries: list[str]) -> Optional[bytes]:
+    """生成 .mrs 内容；条目数为域名集合条目数，trie 中后缀条目按 mrs_keys 展开。没有可用的 zstd 实现时返回 None"""
+    if _compress is None:
+        return None
+    extra = b""
+    data = b"".join((
+        MRS_MAGIC,
+        bytes((MRS_BEHAVIOR_DOMAIN,)),
+        struct.pack(">q", len(entries)),
+        struct.pack(">q", len(extra)),
+        extra,
+        encode_domain_set(mrs_keys(entries)),
+    ))
+    return _compress(data)
+
+
+def iter_yaml(result: BuildResult, entries: list[str], skipped: int, now: datetime) -> Iterator[str]:
+    yield f"# {result.ruleset.title}"
+    yield f"# 更新时间：{now.strftime('%Y年%m月%d日 %H:%M')}（北京时间）"
+    yield f"# 由 {result.ruleset.output_path.name} 转换，behavior: domain"
+    yield f"# 无法以域名集合表达（关键字 / 正则 / 非法域名）而未转换的规则数量：{skipped}"
+    yield f"# 规则总数量：{len(entries)}"
+    yield "payload:"
+    for e in entries:
+        yield f"  - '{e}'"
+
+
+def domain_set_paths(result: BuildResult) -> tuple[Path, Path]:
+    path = result.ruleset.output_path
+    return path.with_suffix(".yaml"), path.with_suffix(".mrs")
+
+
+def write_domain_set(result: BuildResult, now: datetime, force: bool = True) -> bool:
+    """
+    写出 .yaml 与 .mrs，返回是否实际写入。
+
+    force 为 False 时只在文件缺失时写出（.list 未变化的情况）。
+    """
+    yaml_path, mrs_path = domain_set_paths(result)
+    if not force and yaml_path.exists() and (mrs_path.exists() or _compress is None):
+        return False
+
+    entries, skipped = domain_entries([*result.rules, *result.keyword_covered])
+    with atomic_open(yaml_path) as f:
+        write_lines(f, iter_yaml(result, entries, skipped, now))
+
+    mrs = encode_mrs(entries)
+    if mrs is None:
+        print(f"zstandard 未安装，跳过 {mrs_path}")
+    else:
+        write_bytes(mrs_path, mrs)
+
+    print(f"Wrote {len(entries)} domains to {yaml_path.with_suffix('')}.{{yaml,mrs}}")
+    return True
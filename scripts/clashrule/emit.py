@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生成文件头部注释并写出 .list 规则文件，以及被排除规则的来源明细
+
+规则在 pipeline 中以规则表 ID 表示，完整的规则字符串只在这里按分组临时生成；
+每段规则按规范顺序排序（与按规则字符串排序一致），相同的规则总是得到逐字节相同的文件。
+"""
+
+import hashlib
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo  # type: ignore
+
+from .compact import REWRITES
+from .config import RULE_TYPES, TMP_DIR
+from .incremental import previous_body_digest
+from .models import BuildResult
+from .regexcheck import CHECKS
+from .store import LABELS, STORE, RuleStore
+from .writer import DiscardWrite, atomic_open, write_lines
+
+CN_NUMBERS = "一二三四五六七八九十"
+
+EXCLUSIONS_DIR = TMP_DIR / "exclusions"
+
+
+def now_bj() -> datetime:
+    return datetime.now(ZoneInfo("Asia/Shanghai"))
+
+
+def build_header(result: BuildResult, now: datetime) -> list[str]:
+    """
+    生成文件头部注释：
+    - 规则名称
+    - 更新时间（北京时间）
+    - 原规则来源与去重排除源
+    - 原规则更新时间（有几个写几个）
+    - 排除规则统计（有排除源时）：被排除的规则按条计数，同一规则被多个排除源覆盖时
+      在每个排除源下各计一次，并单独列出这类规则的数量
+    - 规则总数量
+    """
+    ruleset = result.ruleset
+
+    lines = [
+        f"# {ruleset.title}",
+        f"# 更新时间：{now.strftime('%Y年%m月%d日 %H:%M')}（北京时间）",
+        "# 原规则来源：",
+    ]
+
+    index = 1
+    for src in result.sources:
+        for url in src.urls:
+            lines.append(f"#   {index}. {src.name}源：{url}")
+            index += 1
+    for i, exc in enumerate(result.excludes):
+        for url in exc.urls:
+            lines.append(f"#   {index}. 去重排除源{CN_NUMBERS[i]}（{exc.name}）：{url}")
+            index += 1
+
+    lines.append("# 原规则更新时间：")
+    for src in result.sources + result.excludes:
+        lines.append(f"#   {src.name}源：{src.updated or '未提供'}")
+
+    if result.excludes:
+        lines.append("# 排除规则统计：")
+        lines.append(f"#   被排除的规则数量：{len(result.excluded)}")
+        for exc in result.excludes:
+            lines.append(f"#     其中来自 {exc.name}：{result.removed.get(exc.name, 0)}")
+        if len(result.excludes) > 1:
+            overlapping = sum(1 for mask in result.excluded.values() if mask & (mask - 1))
+            lines.append(f"#     同时被多个排除源覆盖的规则：{overlapping}")
+        lines.append(f"#   未在任何排除源中找到的规则：{len(result.rules)}")
+
+    if result.whitelisted:
+        removed = sum(len(v) for v in result.whitelisted.values())
+        lines.append(f"# 命中白名单而移除的规则数量：{removed}")
+    if result.regexes:
+        lines.append("# DOMAIN-REGEX 检查：")
+        for key, patterns in result.regexes.items():
+            lines.append(f"#   {CHECKS[key]}：{len(patterns)}")
+    if result.compacted:
+        lines.append(f"# 规则压缩移除的冗余规则数量：{sum(result.compacted.values())}")
+        for key, count in result.compacted.items():
+            lines.append(f"#   {REWRITES[key]}：{count}")
+
+    lines.append(f"# 规则总数量：{len(result.rules)}")
+    lines.append("")
+    return lines
+
+
+def group_rules_by_type(rules: Iterable[int], store: RuleStore = STORE) -> dict[str, list[int]]:
+    """规则类型 -> 规则 ID，类型按 RULE_TYPES 的顺序，类型内保持原顺序"""
+    grouped: dict[str, list[int]] = {t: [] for t in RULE_TYPES}
+    types = store.types
+    for r in rules:
+        grouped[LABELS[types[r]]].append(r)
+    return grouped
+
+
+def group_rules_by_source(result: BuildResult) -> dict[str, list[int]]:
+    grouped: dict[str, list[int]] = {src.name: [] for src in result.sources}
+    for r, src_name in result.rules.items():
+        grouped[src_name].append(r)
+    return grouped
+
+
+def sorted_rules(rules: Iterable[int], store: RuleStore = STORE) -> list[int]:
+    """
+    规范排序：与按完整规则字符串排序的结果一致（先类型标签、再值），
+    但只对每种类型的 ID 按值排序，不生成规则字符串。
+    """
+    grouped = group_rules_by_type(rules, store)
+    key = store.values.__getitem__
+    ordered: list[int] = []
+    for t in sorted(grouped):
+        ordered.extend(sorted(grouped[t], key=key))
+    return ordered
+
+
+def iter_sections(result: BuildResult, store: RuleStore = STORE) -> Iterator[tuple[Optional[str], list[int]]]:
+    """按 layout 返回 (分段标题, 规则 ID)；flat 只有一段且没有标题"""
+    ruleset = result.ruleset
+
+    if ruleset.layout == "flat":
+        yield None, sorted_rules(result.rules, store) if ruleset.sort else list(result.rules)
+        return
+
+    if ruleset.layout == "by_source":
+        for name, ids in group_rules_by_source(result).items():
+            yield f"# ===== {name} =====", sorted_rules(ids, store)
+        return
+
+    for t, ids in group_rules_by_type(result.rules, store).items():
+        if ids:
+            yield f"# === {t} 规则 ===", sorted(ids, key=store.values.__getitem__) if ruleset.sort else ids
+
+
+def iter_body(result: BuildResult, store: RuleStore = STORE) -> Iterator[str]:
+    """逐行生成正文，分段之间空一行；每段的规则字符串在写出时才生成"""
+    types, values = store.types, store.values
+    for i, (title, ids) in enumerate(iter_sections(result, store)):
+        if i:
+            yield ""
+        if title is not None:
+            yield title
+        for r in ids:
+            yield f"{LABELS[types[r]]},{values[r]}"
+
+
+def write_ruleset(
+    result: BuildResult,
+    now: datetime | None = None,
+    incremental: bool = False,
+    path: Path | None = None,
+) -> bool:
+    """
+    写出规则文件，返回是否实际写入。
+
+    头部与正文直接逐批写入临时文件，完成后原子替换目标文件，不在内存中拼出整个文件。
+    incremental 为 True 且正文摘要与已有文件一致时放弃临时文件，头部的更新时间也保持不变。
+    path 默认为规则集配置的输出路径。
+    """
+    path = path or result.ruleset.output_path
+    previous = previous_body_digest(path) if incremental else None
+    header = "\n".join(build_header(result, now or now_bj()))
+    digest = hashlib.sha256()
+
+    try:
+        with atomic_open(path) as f:
+            f.write(header.encode("utf-8"))
+            body = iter_body(result)
+            first = next(body, None)
+            if first is not None:
+                f.write(b"\n")
+                write_lines(f, chain((first,), body), digest)
+            if digest.hexdigest() == previous:
+                raise DiscardWrite
+    except DiscardWrite:
+        print(f"Unchanged {path}, skip writing")
+        return False
+
+    print(f"Wrote {len(result.rules)} rules to {path}")
+    return True
+
+
+def exclusions_path(result: BuildResult) -> Path:
+    return EXCLUSIONS_DIR / f"{result.ruleset.name}.tsv"
+
+
+def write_exclusions(result: BuildResult, path: Path | None = None, store: RuleStore = STORE) -> None:
+    """
+    写出被排除规则的来源明细：每行一条规则及覆盖它的全部排除源，制表符分隔，按规则排序。
+    """
+    path = path or exclusions_path(result)
+    names = [exc.name for exc in result.excludes]
+    labels: dict[int, str] = {}
+    for mask in result.excluded.values():
+        if mask not in labels:
+            labels[mask] = ",".join(n for i, n in enumerate(names) if mask >> i & 1)
+
+    types, values = store.types, store.values
+    with atomic_open(path) as f:
+        write_lines(f, [
+            f"# {result.ruleset.name} 被排除的规则：{len(result.excluded)} 条",
+            "# 规则\t覆盖它的排除源",
+        ])
+        write_lines(f, (
+            f"{LABELS[types[r]]},{values[r]}\t{labels[result.excluded[r]]}"
+            for r in sorted_rules(result.excluded, store)
+        ))
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上游规则下载
+
+基于 asyncio 调度：所有地址并发下载，总并发数与单个主机的并发数由信号量限制，
+总耗时取决于最慢的来源，而不是所有来源耗时之和。requests 没有异步接口，
+每次请求在线程池中执行，调度、重试等待与时限都在事件循环中完成。
+配置了 HttpCache 时发送条件请求，上游返回 304 则直接使用缓存内容。
+
+失败处理：
+  - 连接失败、超时、5xx / 408 / 429、空响应可以重试，按指数退避加随机抖动等待后重试
+  - 同一地址重试 RETRIES 次仍失败时，raw.githubusercontent.com 的地址依次改用 jsDelivr 与
+    ghproxy 类镜像下载（见 mirror_urls）
+  - 每个来源（含全部重试与镜像）有总时限 DEADLINE，从首次取得并发名额时开始计算，
+    排队等待名额的时间不计入；读取过程中超时立即中止，慢主机不会把整个构建拖到多个完整的超时
+  - 404 等其它 4xx 不重试
+
+响应按块流式读取，逐行交给调用方提供的 consume 回调（通常直接解析进去重结构），
+整个响应体不会完整驻留内存；写缓存也是边读边写。
+"""
+
+import asyncio
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import CHUNK_SIZE, HttpCache
+from .instrument import FetchRecord, RunReport
+from .parse import iter_text_lines
+
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+DEADLINE = 120
+RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 16.0
+MAX_WORKERS = 8
+PER_HOST = 4
+
+JSDELIVR = "https://cdn.jsdelivr.net/gh"
+# ghproxy 类镜像：在原地址前加上前缀
+GHPROXY_MIRRORS = ("https://ghproxy.net/",)
+
+_RAW_GITHUB_RE = re.compile(r"https://raw\.githubusercontent\.com/([^/]+)/([^/]+)/(?:refs/heads/)?([^/]+)/(.+)")
+
+# consume(逐行迭代器, 是否来自 304 缓存) -> 任意结果
+Consumer = Callable[[Iterator[str], bool], Any]
+
+
+class EmptyResponse(Exception):
+    """上游返回了空内容（或解析不出任何规则），按下载失败处理，可以重试或改用镜像"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """来源的总时限已到"""
+
+
+@dataclass
+class Fetched:
+    """
+    一次下载的结果。
+
+    result：consume 回调的返回值
+    not_modified：上游返回 304，内容来自缓存
+    size：实际通过网络读取的字节数
+    served_by：实际提供内容的地址（使用镜像时与 url 不同）
+    attempts：请求次数（含重试与镜像）
+    """
+
+    url: str
+    result: Any
+    not_modified: bool = False
+    size: int = 0
+    served_by: Optional[str] = None
+    attempts: int = 1
+
+
+FetchOutcome = Union[Fetched, Exception]
+
+
+def mirror_urls(url: str) -> list[str]:
+    """raw.githubusercontent.com 地址的镜像地址，其它地址没有镜像"""
+    m = _RAW_GITHUB_RE.fullmatch(url)
+    if m is None:
+        return []
+    owner, repo, branch, path = m.groups()
+    return [f"{JSDELIVR}/{owner}/{repo}@{branch}/{path}", *(prefix + url for prefix in GHPROXY_MIRRORS)]
+
+
+def backoff(attempt: int) -> float:
+    """第 attempt 次重试前的等待时间：指数增长的上限内均匀随机（full jitter）"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def retryable(error: Exception) -> bool:
+    if isinstance(error, requests.HTTPError):
+        status = error.response.status_code if error.response is not None else 0
+        return status in (408, 429) or status >= 500
+    return isinstance(error, (EmptyResponse, requests.RequestException, OSError))
+
+
+class Fetcher:
+    """
+    共享 Session 的并发下载器。
+
+    max_workers：同时进行的下载数
+    per_host：同一主机同时进行的下载数（raw.githubusercontent.com 会被多个来源共用）
+    cache：条件请求缓存，为 None 时每次完整下载
+    report：记录每个地址的耗时、字节数、请求次数与实际使用的地址
+    deadline：每个来源的总时限（秒）
+    retries：同一地址的请求次数，之后改用镜像
+    """
+
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        per_host: int = PER_HOST,
+        cache: Optional[HttpCache] = None,
+        report: Optional[RunReport] = None,
+        deadline: float = DEADLINE,
+        retries: int = RETRIES,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.cache = cache
+        self.report = report
+        self.deadline = deadline
+        self.retries = max(1, retries)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.per_host, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def __enter__(self) -> "Fetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def fetch(self, url: str, consume: Consumer, target: Optional[str] = None, deadline: Optional[float] = None) -> Fetched:
+        """
+        同步下载一次：从 target（默认为 url，使用镜像时为镜像地址）读取，缓存以 url 为键。
+        deadline 为 time.monotonic() 的时刻，读取过程中超过即抛出 DeadlineExceeded。
+        """
+        target = target or url
+        mirrored = target != url
+        headers = self.cache.conditional_headers(url) if self.cache and not mirrored else {}
+
+        timeout: tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+        if deadline is not None:
+            remaining = max(0.1, deadline - time.monotonic())
+            timeout = (min(CONNECT_TIMEOUT, remaining), min(READ_TIMEOUT, remaining))
+
+        print(f"Fetching {target}")
+        with self.session.get(target, headers=headers, timeout=timeout, stream=True) as resp:
+            if resp.status_code == 304 and self.cache:
+                print(f"Not modified {url}")
+                return Fetched(url, consume(self.cache.iter_lines(url), True), not_modified=True, served_by=target)
+
+            resp.raise_for_status()
+
+            size = 0
+
+            def counted(chunks: Iterable[bytes]) -> Iterator[bytes]:
+                nonlocal size
+                for chunk in chunks:
+                    if deadline is not None and time.monotonic() > deadline:
+                        raise DeadlineExceeded(f"{url} 超过 {self.deadline} 秒时限")
+                    size += len(chunk)
+                    yield chunk
+                if size == 0:
+                    raise EmptyResponse(f"{target} 返回空内容")
+
+            chunks = counted(resp.iter_content(CHUNK_SIZE))
+            if self.cache:
+                # 镜像的 ETag / Last-Modified 不能用于向上游发送条件请求
+                etag = None if mirrored else resp.headers.get("ETag")
+                last_modified = None if mirrored else resp.headers.get("Last-Modified")
+                chunks = self.cache.tee(url, chunks, etag, last_modified)
+
+            result = consume(iter_text_lines(chunks), False)
+            return Fetched(url, result, size=size, served_by=target)
+
+    async def _fetch_job(
+        self,
+        url: str,
+        consume: Consumer,
+        limit: asyncio.Semaphore,
+        hosts: dict[str, asyncio.Semaphore],
+    ) -> FetchOutcome:
+        start = time.perf_counter()
+        # 首次取得并发名额时才开始计时
+        deadline: Optional[float] = None
+        targets = [url] * self.retries + mirror_urls(url)
+
+        outcome: FetchOutcome = DeadlineExceeded(f"{url} 超过 {self.deadline} 秒时限")
+        attempts = 0
+        for i, target in enumerate(targets):
+            if deadline is not None:
+                if target == targets[i - 1]:
+                    await asyncio.sleep(min(backoff(i - 1), max(0.0, deadline - time.monotonic())))
+                if time.monotonic() >= deadline:
+                    break
+
+            # 先等主机名额再占全局名额：排队等待繁忙主机的任务不占用其它主机可用的全局名额
+            host = hosts.setdefault(urlsplit(target).netloc, asyncio.Semaphore(self.per_host))
+            async with host, limit:
+                if deadline is None:
+                    deadline = time.monotonic() + self.deadline
+                attempts += 1
+                try:
+                    outcome = await asyncio.to_thread(self.fetch, url, consume, target, deadline)
+                    outcome.attempts = attempts
+                    break
+                except (EmptyResponse, requests.RequestException, OSError) as e:
+                    outcome = e
+
+            if not retryable(outcome) and target == url:
+                break
+            print(f"Failed {target}（第 {attempts} 次请求）：{outcome}")
+
+        if self.report is not None:
+            seconds = round(time.perf_counter() - start, 6)
+            if isinstance(outcome, Fetched):
+                mirror = outcome.served_by if outcome.served_by != url else None
+                self.report.record_fetch(FetchRecord(
+                    url, seconds, outcome.size, outcome.not_modified, attempts=attempts, mirror=mirror,
+                ))
+            else:
+                self.report.record_fetch(FetchRecord(url, seconds, error=str(outcome), attempts=attempts))
+        return outcome
+
+    async def _fetch_all(self, jobs: dict[Hashable, tuple[str, Consumer]]) -> dict[Hashable, FetchOutcome]:
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.max_workers))
+        limit = asyncio.Semaphore(self.max_workers)
+        hosts: dict[str, asyncio.Semaphore] = {}
+        outcomes = await asyncio.gather(*(self._fetch_job(url, consume, limit, hosts) for url, consume in jobs.values()))
+        return dict(zip(jobs.keys(), outcomes))
+
+    def fetch_all(self, jobs: dict[Hashable, tuple[str, Consumer]]) -> dict[Hashable, FetchOutcome]:
+        """并发执行全部下载任务，返回 任务键 -> 下载结果或最后一次下载异常"""
+        if not jobs:
+            return {}
+        return asyncio.run(self._fetch_all(jobs))
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则数量异常检查
+
+上游返回错误页或空响应时，规则集可能在没有任何报错的情况下缩水
+（例如 ForeignAI 的 AI_Domains / ChatGPT / GoogleAI 来源全部变为 0 条），客户端随即加载这份残缺的规则集。
+每个规则集写出前统计总数、每个来源、每种规则类型的规则数量，与最近 HISTORY_SIZE 次发布的中位数比较：
+  - 比基线减少超过 MAX_DROP，或增加超过 MAX_GROWTH 时视为异常
+  - 基线低于 MIN_BASELINE 的项不按比例比较，避免小来源的正常波动；
+    但基线不为 0 的项变为 0 条时总是视为异常（例如 ForeignAI 的 OpenAI / Anthropic 等小来源同时归零）
+  - 只与配置相同（cache.config_fingerprint）的历史比较，修改来源或过滤方式后重新积累基线
+
+mode：
+  - "block"：存在异常的规则集不写出，保留上次发布的文件，也不记入历史（默认）
+  - "report"：只提示，照常发布并记入历史；用于确认上游确实发生了大幅变化
+  - "off"：不检查
+
+历史保存在 .github/cache/history.json，异常写入 .github/tmp/guard_report.txt。
+"""
+
+import json
+import statistics
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .cache import CACHE_DIR
+from .config import TMP_DIR, Ruleset
+from .store import STORE, TYPE_IDS, RuleStore
+from .writer import write_bytes
+
+HISTORY_FILE = CACHE_DIR / "history.json"
+REPORT_FILE = TMP_DIR / "guard_report.txt"
+
+MODES = ("block", "report", "off")
+
+# 每个规则集保留的发布次数
+HISTORY_SIZE = 7
+
+# 相对基线的变化比例上限：0.5 表示少于基线的一半，1.0 表示超过基线的两倍
+MAX_DROP = 0.5
+MAX_GROWTH = 1.0
+
+# 基线低于此值的项只检查是否归零
+MIN_BASELINE = 50
+
+
+@dataclass
+class Anomaly:
+    key: str
+    baseline: float
+    count: int
+
+    def describe(self) -> str:
+        change = "减少" if self.count < self.baseline else "增加"
+        ratio = abs(self.count - self.baseline) / self.baseline
+        return f"{self.key}：{self.count} 条，基线 {self.baseline:g} 条，{change} {ratio:.0%}"
+
+
+def rule_counts(ruleset: Ruleset, rules: dict[int, str], store: RuleStore = STORE) -> dict[str, int]:
+    """
+    "total" / "source:<来源>" / "type:<规则类型>" -> 规则数量。
+    配置中的每个来源与规则类型都会列出，没有规则时为 0。
+    """
+    counts = {"total": len(rules)}
+    by_source = Counter(rules.values())
+    for src in ruleset.sources:
+        counts[f"source:{src.name}"] = by_source.get(src.name, 0)
+    types = store.types
+    by_type = Counter(types[r] for r in rules)
+    for label in ruleset.types:
+        counts[f"type:{label}"] = by_type.get(TYPE_IDS[label], 0)
+    return counts
+
+
+def check_counts(
+    counts: dict[str, int],
+    baseline: dict[str, float],
+    max_drop: float = MAX_DROP,
+    max_growth: float = MAX_GROWTH,
+    min_baseline: int = MIN_BASELINE,
+) -> list[Anomaly]:
+    anomalies = []
+    for key, count in counts.items():
+        base = baseline.get(key)
+        if base is None or base == 0:
+            continue
+        if base < min_baseline:
+            if count == 0:
+                anomalies.append(Anomaly(key, base, count))
+            continue
+        if count < base * (1 - max_drop) or count > base * (1 + max_growth):
+            anomalies.append(Anomaly(key, base, count))
+    return anomalies
+
+
+class CountHistory:
+    """规则集名称 -> 最近的发布记录 [{"config": 配置指纹, "counts": {...}}]"""
+
+    def __init__(self, path: Optional[Path] = HISTORY_FILE, size: int = HISTORY_SIZE):
+        self.path = path
+        self.size = size
+        self.entries: dict[str, list[dict]] = {}
+        self.dirty = False
+        if path is not None and path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def baseline(self, name: str, config: str) -> dict[str, float]:
+        """配置相同的历史记录中每一项的中位数"""
+        values: dict[str, list[int]] = {}
+        for entry in self.entries.get(name, ()):
+            if entry.get("config") != config:
+                continue
+            for key, count in entry["counts"].items():
+                values.setdefault(key, []).append(count)
+        return {key: statistics.median(v) for key, v in values.items()}
+
+    def record(self, name: str, config: str, counts: dict[str, int]) -> None:
+        entries = self.entries.setdefault(name, [])
+        entries.append({"config": config, "counts": counts})
+        del entries[:-self.size]
+        self.dirty = True
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        write_bytes(self.path, json.dumps(self.entries, ensure_ascii=False, indent=2).encode("utf-8"))
+        self.dirty = False
+
+
+def write_report(
+    anomalies: dict[str, list[Anomaly]],
+    blocked: set[str],
+    now: datetime,
+    max_drop: float = MAX_DROP,
+    max_growth: float = MAX_GROWTH,
+    min_baseline: int = MIN_BASELINE,
+    path: Path = REPORT_FILE,
+) -> None:
+    lines = [
+        "# 规则数量异常报告",
+        f"# 更新时间：{now.strftime('%Y年%m月%d日 %H:%M')}（北京时间）",
+        f"# 与最近 {HISTORY_SIZE} 次发布的中位数比较，减少超过 {max_drop:.0%} 或增加超过 {max_growth:.0%} 视为异常",
+        f"# 基线低于 {min_baseline} 条的项只在变为 0 条时视为异常",
+        "",
+    ]
+    for name in sorted(anomalies):
+        status = "未发布，保留上次的文件" if name in blocked else "已发布"
+        lines.append(f"## {name}（{status}）")
+        lines.extend(a.describe() for a in anomalies[name])
+        lines.append("")
+
+    write_bytes(path, "\n".join(lines).encode("utf-8"))
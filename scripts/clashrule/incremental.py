@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量生成
+
+每个规则集保存一份上次生成时的快照（规则 -> 来源，gzip 压缩的 JSON），
+本次生成后按来源统计新增 / 删除的规则。正文摘要与已有文件一致时不替换文件，
+连头部的更新时间也保持不变，避免每天只改时间戳的提交。
+"""
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterator, Optional
+
+from .cache import CACHE_DIR
+from .store import STORE, RuleStore
+from .writer import atomic_open
+
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
+
+UNKNOWN_SOURCE = "未知来源"
+
+
+def _snapshot_path(name: str) -> Path:
+    return SNAPSHOT_DIR / f"{name}.json.gz"
+
+
+def load_snapshot(name: str) -> Optional[dict[str, str]]:
+    path = _snapshot_path(name)
+    if not path.exists():
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # 按来源分组保存，来源名称只存一次
+    return {r: src for src, rules in data.items() for r in rules}
+
+
+def save_snapshot(name: str, rules: dict[int, str], store: RuleStore = STORE) -> None:
+    grouped: dict[str, list[int]] = {}
+    for r, src in rules.items():
+        grouped.setdefault(src, []).append(r)
+    grouped = {src: store.rules(ids) for src, ids in grouped.items()}
+
+    with atomic_open(_snapshot_path(name)) as raw, gzip.open(raw, "wt", encoding="utf-8") as f:
+        json.dump(grouped, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def iter_previous_body(path: Path) -> Iterator[bytes]:
+    """逐行读取已有输出文件中头部注释之后的正文（含换行符）；头部以第一个空行结束"""
+    if not path.exists():
+        return
+    with path.open("rb") as f:
+        for line in f:
+            if line in (b"\n", b"\r\n"):
+                break
+        yield from f
+
+
+def previous_body_digest(path: Path) -> Optional[str]:
+    """已有输出文件正文的 sha256，与 writer.write_lines 写出正文时计算的摘要一致"""
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    for line in iter_previous_body(path):
+        digest.update(line)
+    return digest.hexdigest()
+
+
+def previous_rules(path: Path) -> dict[str, str]:
+    """没有快照时退回到已有输出文件，来源记为未知"""
+    rules: dict[str, str] = {}
+    for raw in iter_previous_body(path):
+        line = raw.decode("utf-8", errors="ignore").strip()
+        if line and not line.startswith("#"):
+            rules[line] = UNKNOWN_SOURCE
+    return rules
+
+
+def diff_by_source(
+    old: dict[str, str],
+    new: dict[int, str],
+    store: RuleStore = STORE,
+) -> dict[str, tuple[int, int]]:
+    """
+    返回 来源 -> (新增数量, 删除数量)，删除的规则按上次所属来源统计。
+
+    上次的规则只在规则表中查找 ID，不登记：表中不存在的规则必然已被删除。
+    """
+    kept: set[int] = set()
+    removed: dict[str, int] = {}
+    for r, src in old.items():
+        rid = store.find_rule(r)
+        if rid is not None and rid in new:
+            kept.add(rid)
+        else:
+            removed[src] = removed.get(src, 0) + 1
+
+    stats: dict[str, list[int]] = {}
+    for r, src in new.items():
+        if r not in kept:
+            stats.setdefault(src, [0, 0])[0] += 1
+    for src, count in removed.items():
+        stats.setdefault(src, [0, 0])[1] += count
+    return {src: (added, removed) for src, (added, removed) in stats.items()}
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+运行记录
+
+pipeline 的每个阶段都包在 RunReport.stage() 中，记录耗时、规则数量变化以及阶段结束时的
+进程峰值内存；每个下载记录耗时、字节数与是否命中 304。构建结束后写出 JSON，
+workflow 把它作为构建产物保留，便于跨天比较哪个阶段变慢或变大。
+"""
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore
+
+from .writer import write_bytes
+
+REPORT_NAME = "run_report.json"
+
+
+def peak_rss() -> Optional[int]:
+    """当前进程（含已结束的子进程）的峰值常驻内存，单位字节"""
+    if resource is None:
+        return None
+    # Linux 上 ru_maxrss 单位为 KiB，macOS 上为字节
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) * scale
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    ruleset: Optional[str] = None
+    seconds: float = 0.0
+    rules_in: Optional[int] = None
+    rules_out: Optional[int] = None
+    peak_rss: Optional[int] = None
+
+
+@dataclass
+class FetchRecord:
+    url: str
+    seconds: float
+    bytes: int = 0
+    not_modified: bool = False
+    error: Optional[str] = None
+    attempts: int = 1
+    mirror: Optional[str] = None
+
+
+@dataclass
+class RunReport:
+    started: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    stages: list[StageRecord] = field(default_factory=list)
+    fetches: list[FetchRecord] = field(default_factory=list)
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+    @contextmanager
+    def stage(self, name: str, ruleset: Optional[str] = None, rules_in: Optional[int] = None) -> Iterator[StageRecord]:
+        """记录一个阶段；调用方在阶段内设置 record.rules_out"""
+        record = StageRecord(name, ruleset, rules_in=rules_in)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.seconds = round(time.perf_counter() - start, 6)
+            record.peak_rss = peak_rss()
+            self.stages.append(record)
+
+    def record_fetch(self, record: FetchRecord) -> None:
+        self.fetches.append(record)
+
+    def to_dict(self) -> dict:
+        return {
+            "started": self.started,
+            "total_seconds": round(time.perf_counter() - self._start, 6),
+            "bytes_fetched": sum(f.bytes for f in self.fetches),
+            "peak_rss": peak_rss(),
+            "stages": [asdict(s) for s in self.stages],
+            "fetches": [asdict(f) for f in self.fetches],
+        }
+
+    def write(self, path: Path) -> None:
+        write_bytes(path, (json.dumps(self.to_dict(), ensure_ascii=False, indent=2) + "\n").encode("utf-8"))
+        print(f"Wrote run report to {path}")
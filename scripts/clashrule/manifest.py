@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输入内容清单
+
+很多上游每次重新发布时规则不变，只更新头部的时间戳（例如 blackmatrix7 的 "# UPDATED:"），
+HTTP 缓存只能识别逐字节相同的响应。清单为每个规则集记录全部输入的规范化内容摘要：
+  - sources：每个来源地址解析后的规则行（不含注释与头部），保持上游顺序
+  - excludes：每个排除源上次生成的规则集合
+  - whitelist：启用白名单时的白名单规则
+  - config：规则集配置指纹（cache.config_fingerprint）
+以及本规则集生成的规则集合（output），供下游比较。
+
+全部输入的摘要与上次生成时相同、且输出文件存在时跳过该规则集。上游规则集重新生成
+但规则集合不变时，下游的 excludes 摘要不变，同样可以跳过，只有依赖链上真正变化的
+规则集会重新计算。
+
+清单保存在 .github/cache/manifest.json，与下载缓存一起由 actions/cache 保留。
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .cache import config_fingerprint
+from .config import Ruleset
+from .store import STORE, RuleStore
+from .writer import write_bytes
+
+MANIFEST_NAME = "manifest.json"
+
+# 规则集名称 -> 输入类别 -> 摘要（sources / excludes 为 名称 -> 摘要）
+Inputs = dict[str, object]
+
+
+def rules_digest(rules: Iterable[int], store: RuleStore = STORE, ordered: bool = True) -> str:
+    """
+    规则 ID 的内容摘要，按规则字符串计算，与规则表中的 ID 分配无关。
+    ordered 为 False 时先排序，只比较规则集合。
+    """
+    lines = store.rules(rules)
+    if not ordered:
+        lines.sort()
+    return hashlib.sha1("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def whitelist_digest(rules: Iterable[str]) -> str:
+    return hashlib.sha1("\n".join(sorted(rules)).encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """path 为 None 时只在内存中记录"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path is not None and path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def output(self, name: str) -> Optional[str]:
+        """规则集 name 上次生成的规则集合摘要"""
+        entry = self.entries.get(name)
+        return entry.get("output") if isinstance(entry, dict) else None
+
+    def unchanged(self, ruleset: Ruleset, inputs: Inputs) -> bool:
+        """
+        全部输入的摘要都与上次相同时为 True。下载失败的来源记为 None，与上次同样失败时视为未变化；
+        排除源的摘要未知时总是重新生成。
+        """
+        entry = self.entries.get(ruleset.name)
+        if not isinstance(entry, dict) or entry.get("output") is None:
+            return False
+        if None in inputs["excludes"].values():
+            return False
+        return all(entry.get(key) == value for key, value in inputs.items())
+
+    def record(self, name: str, inputs: Inputs, output: str) -> None:
+        self.entries[name] = {**inputs, "output": output}
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        data = json.dumps(self.entries, ensure_ascii=False, indent=2, sort_keys=True)
+        write_bytes(self.path, data.encode("utf-8"))
+
+
+def ruleset_inputs(
+    ruleset: Ruleset,
+    sources: dict[str, Optional[str]],
+    outputs: dict[str, Optional[str]],
+    whitelist: Optional[str] = None,
+) -> Inputs:
+    """
+    sources：本规则集每个 "来源名 地址" -> 内容摘要，下载失败时为 None
+    outputs：排除源名称 -> 规则集合摘要，未知时为 None
+    """
+    return {
+        "config": config_fingerprint(ruleset),
+        "sources": sources,
+        "excludes": {dep: outputs.get(dep) for dep in ruleset.excludes},
+        "whitelist": whitelist if ruleset.whitelist else None,
+    }
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则匹配模拟
+
+把生成的 .list 载入与客户端相同思路的匹配结构，回放一批查询域名，
+统计每秒查询数、内存占用以及每个域名命中的规则，用于比较规则集改动的实际匹配开销：
+  - DOMAIN / DOMAIN-SUFFIX：按标签倒序的后缀树，沿树走一遍即可得到全部候选
+  - DOMAIN-KEYWORD：Aho-Corasick 自动机，一次扫描找出所有关键字
+  - DOMAIN-REGEX：全部正则合并为一个正则，命中后由分组名定位具体规则
+
+同一规则集内的规则策略相同，命中优先级为：DOMAIN > 最长的 DOMAIN-SUFFIX > DOMAIN-KEYWORD > DOMAIN-REGEX。
+"""
+
+import random
+import re
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .config import RULESET_DIR
+from .parse import parse_lines, split_rule
+from .suffix import Automaton
+
+# 后缀树节点中保存规则的键，与域名标签不会冲突
+_EXACT = ","
+_SUFFIX = ",,"
+
+
+class RuleMatcher:
+    def __init__(self, rules: Iterable[str]):
+        self.trie: dict = {}
+        self.counts: dict[str, int] = {}
+        self.invalid: list[str] = []
+        keywords: dict[str, str] = {}
+        regexes: list[tuple[str, str]] = []
+
+        for rule in rules:
+            rule_type, value = split_rule(rule)
+            self.counts[rule_type] = self.counts.get(rule_type, 0) + 1
+            if rule_type in ("DOMAIN", "DOMAIN-SUFFIX"):
+                node = self.trie
+                for label in reversed(value.split(".")):
+                    node = node.setdefault(label, {})
+                node.setdefault(_EXACT if rule_type == "DOMAIN" else _SUFFIX, rule)
+            elif rule_type == "DOMAIN-KEYWORD":
+                keywords.setdefault(value, rule)
+            elif rule_type == "DOMAIN-REGEX":
+                try:
+                    re.compile(value)
+                except re.error:
+                    self.invalid.append(rule)
+                    continue
+                regexes.append((value, rule))
+
+        self.keyword_rules = keywords
+        self.automaton = Automaton(keywords) if keywords else None
+        self.regex_rules, self.regex, self.regex_fallback = self._compile_regexes(regexes)
+
+    @staticmethod
+    def _compile_regexes(regexes: list[tuple[str, str]]):
+        """
+        合并为 (?P<r0>...)|(?P<r1>...) 的单个正则；
+        个别正则自带分组名或全局标志导致无法合并时，这些正则单独匹配。
+        """
+        rules: dict[str, str] = {}
+        parts: list[str] = []
+        fallback: list[tuple[re.Pattern, str]] = []
+        for i, (pattern, rule) in enumerate(regexes):
+            part = f"(?P<r{i}>{pattern})"
+            try:
+                re.compile(part)
+            except re.error:
+                fallback.append((re.compile(pattern), rule))
+                continue
+            rules[f"r{i}"] = rule
+            parts.append(part)
+        combined = re.compile("|".join(parts)) if parts else None
+        return rules, combined, fallback
+
+    def match(self, domain: str) -> Optional[str]:
+        """返回命中的规则，不命中时返回 None"""
+        domain = domain.lower()
+
+        node = self.trie
+        suffix_rule = None
+        for label in reversed(domain.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            suffix_rule = node.get(_SUFFIX, suffix_rule)
+        else:
+            if _EXACT in node:
+                return node[_EXACT]
+        if suffix_rule is not None:
+            return suffix_rule
+
+        if self.automaton is not None:
+            keyword = self.automaton.search(domain)
+            if keyword is not None:
+                return self.keyword_rules[keyword]
+
+        if self.regex is not None:
+            m = self.regex.search(domain)
+            if m:
+                return self.regex_rules[m.lastgroup]
+        for pattern, rule in self.regex_fallback:
+            if pattern.search(domain):
+                return rule
+
+        return None
+
+
+@dataclass
+class SimulationReport:
+    path: str
+    rules: dict[str, int]
+    invalid_regex: int
+    build_seconds: float
+    memory_bytes: int
+    queries: int
+    seconds: float
+    hits: dict[str, int] = field(default_factory=dict)
+    samples: list[tuple[str, Optional[str]]] = field(default_factory=list)
+
+    @property
+    def lookups_per_sec(self) -> int:
+        return round(self.queries / self.seconds) if self.seconds else 0
+
+    def to_dict(self) -> dict:
+        return {
+            "path": self.path,
+            "rules": self.rules,
+            "invalid_regex": self.invalid_regex,
+            "build_seconds": round(self.build_seconds, 6),
+            "memory_bytes": self.memory_bytes,
+            "queries": self.queries,
+            "seconds": round(self.seconds, 6),
+            "lookups_per_sec": self.lookups_per_sec,
+            "hits": self.hits,
+            "samples": [{"domain": d, "rule": r} for d, r in self.samples],
+        }
+
+
+def load_rules(path: Path) -> dict[str, None]:
+    with path.open("r", encoding="utf-8", errors="ignore") as f:
+        rules, _ = parse_lines(f)
+    return rules
+
+
+def build_matcher(rules: Iterable[str]) -> tuple[RuleMatcher, float, int]:
+    """返回 (匹配器, 构建耗时, 匹配结构占用的内存字节数)"""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        matcher = RuleMatcher(rules)
+        seconds = time.perf_counter() - start
+        memory, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return matcher, seconds, memory
+
+
+def synthetic_corpus(rules: Iterable[str], size: int, seed: int = 0) -> list[str]:
+    """
+    从规则本身生成查询：约一半是规则域名或其子域名（应命中），
+    另一半是随机域名（多数不命中），保证不同规则集之间可比。
+    """
+    rng = random.Random(seed)
+    domains = [split_rule(r) for r in rules]
+    domains = [(t, v) for t, v in domains if t in ("DOMAIN", "DOMAIN-SUFFIX")]
+
+    corpus = []
+    for i in range(size):
+        if domains and i % 2 == 0:
+            rule_type, value = rng.choice(domains)
+            corpus.append(f"www.{value}" if rule_type == "DOMAIN-SUFFIX" and rng.random() < 0.5 else value)
+        else:
+            corpus.append(f"q{rng.randrange(10**8)}.example{rng.randrange(1000)}.com")
+    return corpus
+
+
+def simulate(path: Path, corpus: list[str], samples: int = 10) -> SimulationReport:
+    rules = load_rules(path)
+    matcher, build_seconds, memory = build_matcher(rules)
+
+    match = matcher.match
+    start = time.perf_counter()
+    results = [match(d) for d in corpus]
+    seconds = time.perf_counter() - start
+
+    hits: dict[str, int] = {}
+    for r in results:
+        key = split_rule(r)[0] if r else "MISS"
+        hits[key] = hits.get(key, 0) + 1
+
+    return SimulationReport(
+        path=path.as_posix(),
+        rules=matcher.counts,
+        invalid_regex=len(matcher.invalid),
+        build_seconds=build_seconds,
+        memory_bytes=memory,
+        queries=len(corpus),
+        seconds=seconds,
+        hits=hits,
+        samples=list(zip(corpus, results))[:samples],
+    )
+
+
+def default_lists() -> list[Path]:
+    return sorted(RULESET_DIR.glob("**/*.list"))
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pipeline 各阶段之间传递的数据结构
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .config import Ruleset
+from .suffix import SuffixIndex
+
+
+@dataclass
+class SourceResult:
+    """
+    单个来源（或排除源）的解析结果，rules 为保留上游顺序的规则 ID 有序集合
+    （见 store.RuleStore）。排除源复用上游 BuildResult.rules 时，值为规则所属来源名称。
+    合并完成后来源的 rules 会被清空，只保留名称、地址与更新时间。
+    """
+
+    name: str
+    urls: tuple[str, ...]
+    rules: dict = field(default_factory=dict)
+    updated: Optional[str] = None
+    index: Optional[SuffixIndex] = field(default=None, repr=False)
+
+
+@dataclass
+class BuildResult:
+    """
+    一个规则集的构建结果。
+
+    rules：最终规则 ID -> 首次出现的来源名称
+    removed：排除源名称 -> 被该排除源命中（含后缀覆盖）的规则数量，同一规则可计入多个排除源
+    excluded：被排除的规则 ID -> 覆盖它的排除源位掩码（第 i 位对应 excludes[i]）
+    compacted：规则压缩的改写类别 -> 移除的规则数量（见 compact.REWRITES）
+    regexes：DOMAIN-REGEX 检查类别 -> 被移除或改写的原正则（见 regexcheck.CHECKS）
+    whitelisted：白名单规则 -> 被其移除的规则
+    changes：与上次生成相比，来源 -> (新增数量, 删除数量)
+    keyword_covered：只因 DOMAIN-KEYWORD 覆盖（压缩或排除）而未写入 .list 的 DOMAIN / DOMAIN-SUFFIX，
+                     域名集合无法表达关键字，写出 .yaml / .mrs 时仍需保留
+    index：作为下游排除源时使用的后缀索引，首次需要时生成
+    """
+
+    ruleset: Ruleset
+    sources: list[SourceResult]
+    excludes: list[SourceResult]
+    rules: dict[int, str]
+    removed: dict[str, int] = field(default_factory=dict)
+    compacted: dict[str, int] = field(default_factory=dict)
+    whitelisted: dict[str, list[str]] = field(default_factory=dict)
+    regexes: dict[str, list[str]] = field(default_factory=dict)
+    changes: dict[str, tuple[int, int]] = field(default_factory=dict)
+    excluded: dict[int, int] = field(default_factory=dict)
+    keyword_covered: dict[int, str] = field(default_factory=dict)
+    index: Optional[SuffixIndex] = field(default=None, repr=False)
+
+    def excluded_by(self, rid: int) -> list[str]:
+        """覆盖该规则的全部排除源名称"""
+        mask = self.excluded.get(rid, 0)
+        return [exc.name for i, exc in enumerate(self.excludes) if mask >> i & 1]
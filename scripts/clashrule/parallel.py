@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多进程解析
+
+下载线程把响应按行切成固定大小的块，边下载边交给进程池解析，每个块由一个工作进程
+完成过滤与规范化。各块的结果互不共享，在调用线程中按块顺序依次合并，不需要任何锁；
+已提交未合并的块数不超过 MAX_PENDING_PER_WORKER × 进程数，解析跟不上下载时下载线程等待，
+待解析的行占用的内存与响应大小无关；合并时保留首次出现的顺序，结果与单线程 parse_lines 完全一致。
+"filter" 等格式按 parse.BATCH_LINES 行一批解析，批内先后登记 DOMAIN-SUFFIX 与 DOMAIN，
+CHUNK_LINES 取 BATCH_LINES 的整数倍，使分块后的批次边界与单线程解析相同。
+
+小于一个块的响应直接在当前线程解析，避免进程间传输的开销。
+"filter" 格式的例外规则随各块结果一起返回，合并全部分块后再统一应用。
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Iterable, Iterator, Optional
+
+from .parse import BATCH_LINES, FilterExceptions, ParseSpec, apply_exceptions
+from .store import RuleStore
+
+CHUNK_LINES = 6 * BATCH_LINES
+
+# 每次解析中已提交未合并的块数上限（乘以进程数）：解析慢于下载时下载线程在此等待，
+# 内存中只保留有限个待解析的块，不会把整个响应体堆积在进程池队列里
+MAX_PENDING_PER_WORKER = 2
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def _parse_chunk(spec: ParseSpec, lines: list[str]) -> tuple[dict[str, None], Optional[str], FilterExceptions]:
+    exceptions = FilterExceptions()
+    rules, updated = spec.parse(lines, exceptions=exceptions)
+    return rules, updated, exceptions
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[list[str]]:
+    it = iter(lines)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+class ParsePool:
+    """
+    workers 不大于 1 时不创建进程，全部在当前线程解析。
+
+    使用 spawn 启动工作进程：进程池与下载线程同时存在，fork 可能复制到被其它线程持有的锁。
+    """
+
+    def __init__(self, workers: int = 0, chunk_lines: int = CHUNK_LINES):
+        workers = workers or default_workers()
+        self.chunk_lines = chunk_lines
+        self.max_pending = MAX_PENDING_PER_WORKER * max(1, workers)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        if workers > 1:
+            self.executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def __enter__(self) -> "ParsePool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def parse(
+        self,
+        spec: ParseSpec,
+        lines: Iterable[str],
+        store: Optional[RuleStore] = None,
+    ) -> tuple[dict, Optional[str]]:
+        """传入 store 时各块的结果在合并时逐块登记到规则表，返回规则 ID 的有序集合"""
+        if self.executor is None:
+            return spec.parse(lines, store=store)
+
+        chunks = _chunks(lines, self.chunk_lines)
+        first = next(chunks, [])
+        second = next(chunks, None)
+        if second is None:
+            return spec.parse(first, store=store)
+
+        rules: dict = {}
+        updated: Optional[str] = None
+        exceptions = FilterExceptions()
+
+        def merge(future: Future) -> None:
+            nonlocal updated
+            part, part_updated, part_exceptions = future.result()
+            rules.update(store.add_rules(part) if store is not None else part)
+            exceptions.update(part_exceptions)
+            if updated is None:
+                updated = part_updated
+
+        # 按块顺序合并；待合并的块达到上限时先合并最早提交的一块，再提交下一块
+        pending: deque[Future] = deque()
+        for chunk in chain((first, second), chunks):
+            if len(pending) >= self.max_pending:
+                merge(pending.popleft())
+            pending.append(self.executor.submit(_parse_chunk, spec, chunk))
+        while pending:
+            merge(pending.popleft())
+        if exceptions:
+            apply_exceptions(rules, exceptions, store)
+        return rules, updated
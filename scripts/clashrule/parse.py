@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则解析：一次遍历完成过滤、规范化、去重，并顺带提取上游更新时间。
+
+输入是逐行的迭代器，可以直接来自分块下载的响应流，不需要先把整个响应读入内存。
+"""
+
+import codecs
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+from .config import RULE_TYPES
+from .store import EXACT, LABELS, SUFFIX, TYPE_IDS, RuleStore
+from .suffix import parent_suffixes
+
+_DOMAIN = r"[A-Za-z0-9.-]+\.[A-Za-z]{2,}"
+_COLON_RE = re.compile(r"[：:]")
+
+# "domain" 格式的全部行类型合并为一个预编译正则，每种写法对应一个命名分组：
+#   DOMAIN-SUFFIX,example.com / DOMAIN,example.com,策略
+#   0.0.0.0 example.com（hosts）
+#   ||example.com^（Adblock）
+#   - '+.example.com'（Clash payload 列表）
+#   example.com（纯域名）
+# 注释（#、!）与 Adblock 例外（@@）不会命中任何分支；规则前缀不区分大小写，
+# 调用方可以先把整批文本小写化再匹配。
+_DOMAIN_LINE_RE = re.compile(
+    rf"""
+    ^[ \t]*(?:
+        (?i:DOMAIN(?:-SUFFIX)?),[ \t]*(?P<rule>[^\s,]+)[^\n]*
+      | (?:0\.0\.0\.0|127\.0\.0\.1|::1?)[ \t]+(?P<host>{_DOMAIN})[ \t]*(?:\#[^\n]*)?
+      | \|\|(?P<adblock>{_DOMAIN})\^[ \t]*
+      | -[ \t]*(?P<quote>['"]?)(?:\+?\.)?(?P<payload>{_DOMAIN})(?P=quote)[ \t]*
+      | (?P<plain>{_DOMAIN})[ \t]*
+    )\r?$
+    """,
+    re.M | re.X,
+)
+_COMMENT_LINE_RE = re.compile(r"^#[^\n]*", re.M)
+
+# "filter" 格式：hosts 与 Adblock / AdGuard DNS 过滤规则
+#   0.0.0.0 example.com / 127.0.0.1 example.com  -> DOMAIN
+#   example.com                                   -> DOMAIN
+#   ||example.com^ / ||example.com^$third-party   -> DOMAIN-SUFFIX
+#   @@||example.com^                              -> 例外，放行 example.com 及其子域名
+# 含路径、通配符、元素隐藏（##）等无法以域名表达的规则不会命中任何分支。
+_FILTER_LINE_RE = re.compile(
+    rf"""
+    ^[ \t]*(?:
+        (?:0\.0\.0\.0|127\.0\.0\.1|::1?)[ \t]+(?P<host>{_DOMAIN})[ \t]*(?:\#[^\n]*)?
+      | (?P<exception>@@)?\|\|(?P<adblock>{_DOMAIN})\^(?:\$(?P<modifiers>\S+))?[ \t]*
+      | (?P<plain>{_DOMAIN})[ \t]*
+    )\r?$
+    """,
+    re.M | re.X,
+)
+_FILTER_COMMENT_RE = re.compile(r"^[!#][^\n]*", re.M)
+
+# 不缩小规则作用范围的修饰符，按域名整体拦截时可以忽略（与 AdGuard HostlistCompiler 一致）；
+# 带其它修饰符（$script、$domain=、$badfilter、~third-party 等）的规则只在特定请求上生效，跳过
+FILTER_MODIFIERS = frozenset(("important", "third-party", "3p", "document", "doc", "all", "popup", "network"))
+
+# 例外不生效的警告中列出的示例数量
+SHADOWED_EXAMPLES = 5
+
+# 按批拼接后整段匹配，避免在 Python 中逐行分派
+BATCH_LINES = 8192
+
+# 只对域名类规则做小写规范化，关键字 / 正则保持原样
+_LOWER_TYPES = frozenset(("DOMAIN-SUFFIX", "DOMAIN"))
+
+
+def _plain_value(value: str) -> bool:
+    """简单过滤明显非域名/关键字的内容"""
+    return "://" not in value and "/" not in value and " " not in value
+
+
+def _domain_like_value(value: str) -> bool:
+    """必须同时包含 "." 与字母，避免纯 IP"""
+    return "." in value and any(c.isalpha() for c in value)
+
+
+VALUE_FILTERS = {
+    "none": None,
+    "plain": _plain_value,
+    "domain_like": _domain_like_value,
+}
+
+
+def iter_text_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """把分块的 UTF-8 字节流按行切分，内存占用只与块大小有关"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        yield from lines
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def split_rule(rule: str) -> tuple[str, str]:
+    rule_type, value = rule.split(",", 1)
+    return rule_type, value
+
+
+def extract_update_time(comment: str) -> Optional[str]:
+    """
+    从注释行中识别上游更新时间，支持：
+      - blackmatrix7："# UPDATED: YYYY-MM-DD HH:MM:SS"
+      - ACL4SSR / 本仓库："# 更新时间：2026年01月16日 12:51（北京时间）"
+      - 其它："# Last Modified: ..." / "# Last Update: ..."
+      - Adblock："! Last modified: ..." / "! TimeUpdated: ..."
+    """
+    text = comment.lstrip("#!").strip()
+
+    if "UPDATED:" in text:
+        raw = text.split("UPDATED:", 1)[1].strip()
+        try:
+            dt = datetime.strptime(raw, "%Y-%m-%d %H:%M:%S")
+            return dt.strftime("%Y年%m月%d日 %H:%M（北京时间）")
+        except ValueError:
+            return raw + "（北京时间）"
+
+    if "更新时间" in text:
+        parts = _COLON_RE.split(text, 1)
+        return parts[1].strip() if len(parts) == 2 else text
+
+    lowered = text.lower()
+    if "last modified" in lowered or "last update" in lowered or "timeupdated" in lowered:
+        return text
+
+    return None
+
+
+def extract_domain(line: str) -> Optional[str]:
+    """从单行 Clash 规则、hosts、Adblock 或纯域名中提取域名"""
+    m = _DOMAIN_LINE_RE.fullmatch(line.strip())
+    return m[m.lastgroup] if m else None
+
+
+def extract_domains(text: str) -> list[str]:
+    """从整段文本中一次性提取全部域名，保持原有顺序"""
+    return [m[m.lastgroup] for m in _DOMAIN_LINE_RE.finditer(text)]
+
+
+def _batches(lines: Iterable[str], size: int = BATCH_LINES) -> Iterator[str]:
+    it = iter(lines)
+    while batch := list(islice(it, size)):
+        yield "\n".join(batch)
+
+
+@dataclass
+class FilterExceptions:
+    """
+    "filter" 格式中的例外规则。
+
+    domains：例外域名 -> 是否带 $important
+    important：带 $important 的拦截规则的值，只会被同样带 $important 的例外放行
+    """
+
+    domains: dict[str, bool] = field(default_factory=dict)
+    important: set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.domains)
+
+    def update(self, other: "FilterExceptions") -> None:
+        for domain, important in other.domains.items():
+            self.domains[domain] = self.domains.get(domain, False) or important
+        self.important |= other.important
+
+
+def apply_exceptions(rules: dict, exceptions: FilterExceptions, store: Optional[RuleStore] = None) -> int:
+    """
+    按例外规则就地移除被放行的规则，返回移除数量；rules 为规则字符串，或传入 store 时为规则 ID。
+
+    只移除等于或位于例外域名之下的规则。例外域名的父级 DOMAIN-SUFFIX 保留：
+    @@||good.ads.example.com^ 不会放行整个 ||ads.example.com^。
+    Clash 规则无法表达“拦截父域名但放行子域名”，这类例外不生效，打印警告提示。
+    """
+    domains = exceptions.domains
+    ancestors: dict[str, str] = {}
+    for domain in domains:
+        for parent in parent_suffixes(domain):
+            ancestors.setdefault(parent, domain)
+
+    removed = []
+    shadowed = []
+    for r in rules:
+        if store is not None:
+            is_suffix, value = store.types[r] == SUFFIX, store.values[r]
+        else:
+            rule_type, value = split_rule(r)
+            is_suffix = rule_type == "DOMAIN-SUFFIX"
+
+        important = domains.get(value)
+        if important is None:
+            important = next((domains[p] for p in parent_suffixes(value) if p in domains), None)
+        if important is not None and (important or value not in exceptions.important):
+            removed.append(r)
+        elif is_suffix and value in ancestors:
+            shadowed.append(f"{ancestors[value]}（被 {value} 覆盖）")
+
+    for r in removed:
+        del rules[r]
+    if shadowed:
+        examples = "、".join(shadowed[:SHADOWED_EXAMPLES])
+        more = f" 等 {len(shadowed)} 条" if len(shadowed) > SHADOWED_EXAMPLES else ""
+        print(f"Warning: 例外规则位于拦截的父级后缀之下，保留父级规则，例外不生效：{examples}{more}")
+    return len(removed)
+
+
+def _parse_filter(
+    lines: Iterable[str],
+    rules: dict,
+    store: Optional[RuleStore],
+    exceptions: Optional[FilterExceptions],
+) -> tuple[dict, Optional[str]]:
+    """
+    一次遍历解析 hosts / Adblock 规则。
+
+    exceptions 为 None 时在解析结束后直接应用例外；否则只收集到 exceptions 中，
+    由调用方在合并全部分块后统一应用（例外与被放行的规则可能位于不同分块）。
+    """
+    found = exceptions if exceptions is not None else FilterExceptions()
+    updated: Optional[str] = None
+
+    for text in _batches(lines):
+        if updated is None:
+            for m in _FILTER_COMMENT_RE.finditer(text):
+                updated = extract_update_time(m[0])
+                if updated is not None:
+                    break
+
+        # 同一批内按类型分组后成批登记，批内 DOMAIN-SUFFIX 排在 DOMAIN 之前
+        suffixes: list[str] = []
+        exact: list[str] = []
+        for host, exception, value, modifiers, plain in _FILTER_LINE_RE.findall(text.lower()):
+            if modifiers:
+                names = modifiers.split(",")
+                if not FILTER_MODIFIERS.issuperset(names):
+                    continue
+                if "important" in names:
+                    if exception:
+                        found.domains[value] = True
+                        continue
+                    found.important.add(value)
+
+            if not value:
+                exact.append(host or plain)
+            elif exception:
+                found.domains.setdefault(value, False)
+            else:
+                suffixes.append(value)
+
+        for rule_type, values in ((SUFFIX, suffixes), (EXACT, exact)):
+            if store is not None:
+                rules.update(dict.fromkeys(store.add_values(rule_type, values)))
+            else:
+                prefix = f"{LABELS[rule_type]},"
+                rules.update(dict.fromkeys(prefix + v for v in values))
+
+    if exceptions is None and found:
+        apply_exceptions(rules, found, store)
+    return rules, updated
+
+
+def parse_lines(
+    lines: Iterable[str],
+    fmt: str = "clash",
+    types: tuple[str, ...] = RULE_TYPES,
+    value_filter: str = "none",
+    rules: Optional[dict] = None,
+    store: Optional[RuleStore] = None,
+    exceptions: Optional[FilterExceptions] = None,
+) -> tuple[dict, Optional[str]]:
+    """
+    解析规则行，返回 (规则, 更新时间)。
+
+    规则以 dict 作为有序集合保存（保留上游顺序，重复行只保留第一次出现）；
+    传入 rules 时直接合并到已有集合中，多个地址可以共享同一个去重结构。
+    传入 store 时规则直接登记到规则表，集合中保存规则 ID，不生成 "类型,值" 字符串。
+    exceptions 只用于 "filter" 格式，见 _parse_filter。
+    """
+    if rules is None:
+        rules = {}
+    updated: Optional[str] = None
+
+    if fmt == "filter":
+        return _parse_filter(lines, rules, store, exceptions)
+
+    if fmt == "domain":
+        for text in _batches(lines):
+            if updated is None:
+                for m in _COMMENT_LINE_RE.finditer(text):
+                    updated = extract_update_time(m[0])
+                    if updated is not None:
+                        break
+            domains = extract_domains(text.lower())
+            if store is not None:
+                rules.update(dict.fromkeys(store.add_values(SUFFIX, domains)))
+            else:
+                rules.update(dict.fromkeys(map("DOMAIN-SUFFIX,".__add__, domains)))
+        return rules, updated
+
+    prefixes = tuple(f"{t}," for t in types)
+    keep = VALUE_FILTERS[value_filter]
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            if updated is None:
+                updated = extract_update_time(line)
+            continue
+        if not line.startswith(prefixes):
+            continue
+
+        rule_type, value = split_rule(line)
+        value = value.strip()
+        if not value:
+            continue
+        if keep is not None and not keep(value):
+            continue
+        if rule_type in _LOWER_TYPES:
+            value = value.lower()
+
+        if store is not None:
+            rules[store.add(TYPE_IDS[rule_type], value)] = None
+        else:
+            rules[f"{rule_type},{value}"] = None
+
+    return rules, updated
+
+
+@dataclass(frozen=True)
+class ParseSpec:
+    """一个来源的解析参数；同一地址在相同参数下的解析结果可以复用"""
+
+    fmt: str = "clash"
+    types: tuple[str, ...] = RULE_TYPES
+    value_filter: str = "none"
+
+    @property
+    def signature(self) -> str:
+        return f"{self.fmt}|{self.types}|{self.value_filter}"
+
+    def parse(
+        self,
+        lines: Iterable[str],
+        rules: Optional[dict] = None,
+        store: Optional[RuleStore] = None,
+        exceptions: Optional[FilterExceptions] = None,
+    ) -> tuple[dict, Optional[str]]:
+        return parse_lines(lines, self.fmt, self.types, self.value_filter, rules, store, exceptions)
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则集构建流程：下载 -> 解析 -> 合并去重 -> 排除 -> 写出
+
+规则集之间通过 excludes 形成依赖图（BanAD -> Advertising -> AdGuardSDNSFilter
+-> BanProgramAD -> BanEasyPrivacy，同一策略分组内的顺序由 config.Ruleset.group 生成），
+run() 按拓扑顺序在同一进程内构建，上游阶段的内存结果直接作为下游的排除源，
+不再回头下载本仓库已发布的文件（见 dedupe.DedupeIndex）。
+
+启用下载缓存时，全部来源的规则内容、排除源的规则集合、白名单与配置都与上次生成时
+相同的规则集会被跳过（见 manifest.py），下游需要时从本地输出文件读取它作为排除源。
+
+规则在各阶段之间以规则表（store.RuleStore）中的整数 ID 传递，同一条规则无论出现在
+多少个来源、排除源与索引中，字符串只保存一份。
+
+写出前检查总数、各来源与各规则类型的规则数量，与历史相比骤减或暴增的规则集不发布（见 guard.py）。
+
+增量模式下与上次快照比较，按来源统计新增 / 删除，规则完全一致时不重写输出文件。
+"""
+
+import os
+from datetime import datetime
+from graphlib import TopologicalSorter
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .cache import HttpCache
+from .compact import compact
+from .config import RULESETS, TMP_DIR, Ruleset, Source
+from .conflict import ConflictError, covered_count, find_conflicts
+from .conflict import write_report as write_conflict_report
+from .dedupe import DedupeIndex
+from .domainset import write_domain_set
+from .emit import now_bj, write_exclusions, write_ruleset
+from .fetch import MAX_WORKERS, PER_HOST, Consumer, Fetched, Fetcher, FetchOutcome
+from .guard import MAX_DROP, MAX_GROWTH, MIN_BASELINE, CountHistory, check_counts, rule_counts
+from .guard import write_report as write_guard_report
+from .incremental import diff_by_source, load_snapshot, previous_rules, save_snapshot
+from .instrument import REPORT_NAME, RunReport
+from .manifest import MANIFEST_NAME, Manifest, rules_digest, ruleset_inputs, whitelist_digest
+from .models import BuildResult, SourceResult
+from .parallel import ParsePool
+from .parse import ParseSpec
+from .regexcheck import CHECKS, REGEX_CACHE_NAME, RegexChecker, check_regexes
+from .store import EXACT, STORE, SUFFIX
+from .whitelist import Whitelist, apply_whitelist, read_report, write_report
+from .writer import write_bytes
+
+
+FetchKey = tuple[str, ParseSpec]
+
+
+def parse_spec(ruleset: Ruleset, source: Source) -> ParseSpec:
+    return ParseSpec(source.fmt, ruleset.types, ruleset.value_filter)
+
+
+def make_consumer(
+    url: str,
+    spec: ParseSpec,
+    cache: Optional[HttpCache] = None,
+    pool: Optional[ParsePool] = None,
+) -> Consumer:
+    """
+    下载过程中直接逐行解析（有进程池时分块并行）；上游未变化时优先复用缓存的解析结果。
+    解析时规则直接登记到规则表，结果中只保存规则 ID。
+    """
+
+    def consume(lines, not_modified: bool) -> tuple[dict[int, None], Optional[str]]:
+        if cache and not_modified:
+            cached = cache.load_parsed(url, spec.signature)
+            if cached is not None:
+                return STORE.add_rules(cached[0]), cached[1]
+
+        rules, updated = pool.parse(spec, lines, STORE) if pool else spec.parse(lines, store=STORE)
+        if cache:
+            cache.store_parsed(url, spec.signature, STORE.rules(rules), updated)
+        return rules, updated
+
+    return consume
+
+
+def fetch_keys(ruleset: Ruleset) -> list[FetchKey]:
+    return [(url, parse_spec(ruleset, src)) for src in ruleset.sources for url in src.urls]
+
+
+def fetch_jobs(
+    rulesets: Iterable[Ruleset],
+    cache: Optional[HttpCache] = None,
+    pool: Optional[ParsePool] = None,
+) -> dict[FetchKey, tuple[str, Consumer]]:
+    """同一地址在相同解析参数下只下载、解析一次"""
+    jobs: dict[FetchKey, tuple[str, Consumer]] = {}
+    for ruleset in rulesets:
+        for src in ruleset.sources:
+            spec = parse_spec(ruleset, src)
+            for url in src.urls:
+                if (url, spec) not in jobs:
+                    jobs[(url, spec)] = (url, make_consumer(url, spec, cache, pool))
+    return jobs
+
+
+def load_source(ruleset: Ruleset, source: Source, fetched: dict[FetchKey, FetchOutcome]) -> SourceResult:
+    result = SourceResult(source.name, source.urls)
+    spec = parse_spec(ruleset, source)
+
+    failed = 0
+    for url in source.urls:
+        outcome = fetched[(url, spec)]
+        if isinstance(outcome, Exception):
+            if not ruleset.skip_failed:
+                raise outcome
+            print(f"Skip {url}: {outcome}")
+            failed += 1
+            continue
+
+        rules, updated = outcome.result
+        result.rules.update(rules)
+        if result.updated is None:
+            result.updated = updated
+
+    # 全部地址都失败时在日志与文件头部明确标出，而不是静默得到一个空来源
+    if failed and failed == len(source.urls):
+        print(f"Warning: {ruleset.name} 的来源 {source.name} 全部 {failed} 个地址下载失败")
+        result.updated = "全部地址下载失败"
+
+    return result
+
+
+def merge_sources(sources: list[SourceResult]) -> dict[int, str]:
+    """合并所有来源，规则归属于首次出现的来源"""
+    merged: dict[int, str] = {}
+    for src in sources:
+        for r in src.rules:
+            merged.setdefault(r, src.name)
+    return merged
+
+
+def apply_excludes(rules: dict[int, str], excludes: list[SourceResult]) -> tuple[dict[int, str], dict[int, int]]:
+    """
+    去掉已被排除源覆盖的规则：精确相同，或被排除源中的 DOMAIN-SUFFIX / DOMAIN-KEYWORD 覆盖
+    （例如排除源有 DOMAIN-SUFFIX,example.com 时，DOMAIN,ads.example.com 也会被去掉）。
+
+    一次遍历即为每条规则标记覆盖它的全部排除源，返回 (保留的规则, 被排除的规则 -> 排除源位掩码)，
+    位掩码第 i 位对应 excludes[i]。
+    """
+    indexes = [exc.index for exc in excludes]
+    kept: dict[int, str] = {}
+    excluded: dict[int, int] = {}
+
+    for r, src in rules.items():
+        mask = 0
+        for i, index in enumerate(indexes):
+            if index.covers(r):
+                mask |= 1 << i
+        if mask:
+            excluded[r] = mask
+        else:
+            kept[r] = src
+
+    return kept, excluded
+
+
+def exclusion_counts(excluded: dict[int, int], excludes: list[SourceResult]) -> dict[str, int]:
+    """排除源名称 -> 覆盖的规则数量；同时被多个排除源覆盖的规则在每个排除源下各计一次"""
+    by_mask: dict[int, int] = {}
+    for mask in excluded.values():
+        by_mask[mask] = by_mask.get(mask, 0) + 1
+    return {
+        exc.name: sum(n for mask, n in by_mask.items() if mask >> i & 1)
+        for i, exc in enumerate(excludes)
+    }
+
+
+def dump_sources(sources: list[SourceResult]) -> None:
+    """保存每个来源的域名快照，便于排查上游变化"""
+    for src in sources:
+        domains = sorted(STORE.values[r] for r in src.rules)
+        write_bytes(TMP_DIR / f"{src.name}.txt", "\n".join(domains).encode("utf-8"))
+
+
+def build_ruleset(
+    ruleset: Ruleset,
+    built: dict[str, BuildResult] | None = None,
+    now: datetime | None = None,
+    fetched: dict[FetchKey, FetchOutcome] | None = None,
+    cache: Optional[HttpCache] = None,
+    whitelist: Optional[Whitelist] = None,
+    report: Optional[RunReport] = None,
+    regexes: Optional[RegexChecker] = None,
+    dedupe: Optional[DedupeIndex] = None,
+) -> BuildResult:
+    built = built if built is not None else {}
+    now = now or now_bj()
+    dedupe = dedupe or DedupeIndex(built, now)
+    report = report or RunReport()
+    name = ruleset.name
+    if fetched is None:
+        with Fetcher(cache=cache, report=report) as fetcher:
+            fetched = fetcher.fetch_all(fetch_jobs([ruleset], cache))
+
+    with report.stage("load_excludes", name) as st:
+        excludes = [dedupe.source(exc) for exc in ruleset.excludes]
+        st.rules_out = sum(len(exc.rules) for exc in excludes)
+
+    with report.stage("merge", name) as st:
+        sources = [load_source(ruleset, src, fetched) for src in ruleset.sources]
+        st.rules_in = sum(len(src.rules) for src in sources)
+        rules = merge_sources(sources)
+        st.rules_out = len(rules)
+
+    if ruleset.dump_sources:
+        dump_sources(sources)
+    # 合并后各来源的规则不再使用，只保留名称、地址与更新时间用于文件头部
+    for src in sources:
+        src.rules = {}
+
+    # 无法编译或回溯失控的正则不写入规则集；能以后缀 / 关键字表达的正则先改写，再参与后续阶段
+    with report.stage("regex", name, len(rules)) as st:
+        rules, checked = check_regexes(rules, regexes or RegexChecker())
+        st.rules_out = len(rules)
+    for key in ("invalid", "slow"):
+        for pattern in checked.get(key, ()):
+            print(f"{name}: 移除 DOMAIN-REGEX,{pattern}（{CHECKS[key]}）")
+
+    # 先按白名单移除，再做规则压缩：被白名单移除的宽泛后缀不应再吞掉其下的规则
+    whitelisted: dict[str, list[str]] = {}
+    if ruleset.whitelist:
+        with report.stage("whitelist", name, len(rules)) as st:
+            if whitelist is None:
+                whitelist = Whitelist.load()
+            rules, whitelisted = apply_whitelist(rules, whitelist)
+            st.rules_out = len(rules)
+
+    with report.stage("compact", name, len(rules)) as st:
+        rules, compacted, keyword_covered = compact(rules)
+        st.rules_out = len(rules)
+
+    with report.stage("exclude", name, len(rules)) as st:
+        kept, excluded = apply_excludes(rules, excludes)
+        st.rules_out = len(kept)
+
+    # 域名集合不含关键字：只被关键字覆盖的域名不写入 .list，但仍要写入 .yaml / .mrs
+    indexes = [exc.index for exc in excludes]
+    types = STORE.types
+    keyword_covered.update((r, rules[r]) for r in excluded if types[r] == SUFFIX or types[r] == EXACT)
+    keyword_covered = {
+        r: src for r, src in keyword_covered.items()
+        if not any(index.covers_domain(r) for index in indexes)
+    }
+    rules = kept
+
+    removed = exclusion_counts(excluded, excludes)
+    return BuildResult(
+        ruleset, sources, excludes, rules, removed, compacted, whitelisted,
+        regexes=checked, excluded=excluded, keyword_covered=keyword_covered,
+    )
+
+
+def resolve_order(names: Iterable[str], with_deps: bool = False) -> list[str]:
+    """
+    按依赖关系排序待构建的规则集。
+
+    with_deps 为 True 时把所有上游依赖一并加入本次构建；
+    否则未加入的依赖从本地输出文件读取。
+    """
+    selected = set(names)
+    if with_deps:
+        pending = list(selected)
+        while pending:
+            for dep in RULESETS[pending.pop()].excludes:
+                if dep not in selected:
+                    selected.add(dep)
+                    pending.append(dep)
+
+    graph = {
+        name: [dep for dep in RULESETS[name].excludes if dep in selected]
+        for name in RULESETS
+        if name in selected
+    }
+    return list(TopologicalSorter(graph).static_order())
+
+
+def source_digests(
+    ruleset: Ruleset,
+    fetched: dict[FetchKey, FetchOutcome],
+    digests: dict[FetchKey, Optional[str]],
+) -> dict[str, Optional[str]]:
+    """
+    "来源名 地址" -> 解析后规则行的摘要，下载失败时为 None。
+    digests 在同一次运行内缓存每个下载结果的摘要，多个规则集共用的地址只计算一次。
+    """
+    result = {}
+    for src in ruleset.sources:
+        spec = parse_spec(ruleset, src)
+        for url in src.urls:
+            key = (url, spec)
+            if key not in digests:
+                outcome = fetched[key]
+                digests[key] = rules_digest(outcome.result[0]) if isinstance(outcome, Fetched) else None
+            result[f"{src.name} {url}"] = digests[key]
+    return result
+
+
+def is_unchanged(ruleset: Ruleset, inputs: dict, manifest: Manifest) -> bool:
+    """全部输入的内容摘要与上次生成时相同且输出文件存在时无需重新生成"""
+    return ruleset.output_path.exists() and manifest.unchanged(ruleset, inputs)
+
+
+def default_report_path(rulesets: list[Ruleset]) -> Path:
+    """运行记录写在本次输出文件的共同目录下，例如只构建 AD 时为 Clash/Ruleset/AD/run_report.json"""
+    common = os.path.commonpath([r.output_path.parent for r in rulesets])
+    return Path(common) / REPORT_NAME
+
+
+def run(
+    names: Iterable[str],
+    with_deps: bool = False,
+    max_workers: int = MAX_WORKERS,
+    per_host: int = PER_HOST,
+    use_cache: bool = True,
+    force: bool = False,
+    incremental: bool = True,
+    parse_workers: int = 0,
+    report_path: Optional[Path] = None,
+    conflicts: str = "report",
+    guard: str = "block",
+    max_drop: float = MAX_DROP,
+    max_growth: float = MAX_GROWTH,
+    min_baseline: int = MIN_BASELINE,
+) -> dict[str, BuildResult]:
+    """
+    guard：规则数量异常检查方式（见 guard.py），max_drop / max_growth 为相对历史基线的变化比例上限，
+    基线低于 min_baseline 的项只检查是否归零
+      - "block"：存在异常的规则集不写出，保留上次发布的文件
+      - "report"：写出异常报告，照常发布
+      - "off"：不检查
+
+    conflicts：策略冲突检查方式（见 conflict.py）
+      - "report"：写出 .github/tmp/conflict_report.txt
+      - "fail"：写出报告，存在冲突时在全部输出完成后抛出 ConflictError，使构建失败、不发布
+      - "off"：不检查
+    """
+    now = now_bj()
+    report = RunReport()
+    built: dict[str, BuildResult] = {}
+    dedupe = DedupeIndex(built, now)
+    rulesets = [RULESETS[name] for name in resolve_order(names, with_deps)]
+
+    cache = HttpCache() if use_cache else None
+    manifest = Manifest(cache.root / MANIFEST_NAME if cache else None)
+    whitelist = Whitelist.load() if any(r.whitelist for r in rulesets) else None
+    whitelisted_digest = whitelist_digest([*whitelist.exact.values(), *whitelist.suffixes.values()]) if whitelist else None
+    regexes = RegexChecker(cache.root / REGEX_CACHE_NAME if cache else None)
+    history = CountHistory()
+    anomalies = {}
+    blocked = set()
+
+    # 本次构建涉及的全部上游地址一次性并发下载，边下载边在进程池中分块解析
+    with report.stage("fetch") as st:
+        with ParsePool(parse_workers) as pool, Fetcher(max_workers, per_host, cache=cache, report=report) as fetcher:
+            fetched = fetcher.fetch_all(fetch_jobs(rulesets, cache, pool))
+        st.rules_out = sum(len(o.result[0]) for o in fetched.values() if isinstance(o, Fetched))
+
+    # 下载结果在最后一个用到它的规则集处理完后释放
+    last_user = {key: ruleset.name for ruleset in rulesets for key in fetch_keys(ruleset)}
+
+    def release(ruleset: Ruleset) -> None:
+        for key in fetch_keys(ruleset):
+            if last_user[key] == ruleset.name:
+                fetched.pop(key, None)
+
+    # 规则集名称 -> 规则集合摘要：本次生成的取新值，其余沿用清单中上次生成的值
+    outputs = {name: manifest.output(name) for name in RULESETS}
+    digests: dict[FetchKey, Optional[str]] = {}
+
+    for ruleset in rulesets:
+        with report.stage("manifest", ruleset.name):
+            inputs = ruleset_inputs(ruleset, source_digests(ruleset, fetched, digests), outputs, whitelisted_digest)
+        if cache and not force and is_unchanged(ruleset, inputs, manifest):
+            print(f"Skip {ruleset.name}: 输入内容未变化")
+            release(ruleset)
+            continue
+
+        result = build_ruleset(ruleset, built, now, fetched, cache, whitelist, report, regexes, dedupe)
+        release(ruleset)
+
+        # 未发布的规则集不登记到 built：下游与冲突检查读取上次发布的文件，下次运行重新生成
+        if guard != "off":
+            with report.stage("guard", ruleset.name, len(result.rules)):
+                counts = rule_counts(ruleset, result.rules)
+                unusual = check_counts(counts, history.baseline(ruleset.name, inputs["config"]), max_drop, max_growth, min_baseline)
+            if unusual:
+                anomalies[ruleset.name] = unusual
+                for anomaly in unusual:
+                    print(f"{ruleset.name}: 规则数量异常，{anomaly.describe()}")
+                if guard == "block":
+                    print(f"Warning: {ruleset.name} 规则数量异常，未发布，保留上次的文件")
+                    blocked.add(ruleset.name)
+                    continue
+            history.record(ruleset.name, inputs["config"], counts)
+
+        previous = load_snapshot(ruleset.name)
+        if previous is None:
+            previous = previous_rules(ruleset.output_path)
+        result.changes = diff_by_source(previous, result.rules)
+        del previous
+        for src, (added, removed) in result.changes.items():
+            print(f"{ruleset.name} / {src}: +{added} -{removed}")
+
+        with report.stage("write", ruleset.name, len(result.rules)) as st:
+            written = write_ruleset(result, now, incremental=incremental)
+            st.rules_out = len(result.rules) if written else 0
+        if ruleset.domain_set:
+            with report.stage("domain_set", ruleset.name, len(result.rules)):
+                write_domain_set(result, now, force=written)
+        if result.excludes:
+            write_exclusions(result)
+        save_snapshot(ruleset.name, result.rules)
+        built[ruleset.name] = result
+        outputs[ruleset.name] = rules_digest(result.rules, ordered=False)
+        manifest.record(ruleset.name, inputs, outputs[ruleset.name])
+
+    manifest.save()
+    regexes.save()
+    history.save()
+    if guard != "off" and (built or blocked):
+        write_guard_report(anomalies, blocked, now, max_drop, max_growth, min_baseline)
+
+    # 本次跳过（或未发布）的规则集沿用上次报告中的条目，报告内容不随哪些规则集重新生成而变化
+    if any(r.ruleset.whitelist for r in built.values()):
+        previous = read_report()
+        reports = {
+            name: built[name].whitelisted if name in built else previous[name]
+            for name, ruleset in RULESETS.items()
+            if ruleset.whitelist and (name in built or name in previous)
+        }
+        write_report(reports, now)
+
+    # 冲突检查覆盖全部规则集：未参与本次构建的读取本地输出文件，不存在的跳过
+    found = {}
+    conflicted = 0
+    if conflicts != "off" and built:
+        with report.stage("conflicts") as st:
+            names = [n for n in RULESETS if n in built or RULESETS[n].output_path.exists()]
+            rules = {n: dedupe.rules(n) for n in names}
+            st.rules_in = sum(len(v) for v in rules.values())
+            found = find_conflicts(rules)
+            st.rules_out = conflicted = covered_count(found)
+        write_conflict_report(found, now)
+        if found:
+            print(f"策略冲突：{conflicted} 条规则被其它策略分组的规则覆盖，详见 .github/tmp/conflict_report.txt")
+
+    if rulesets:
+        report.write(report_path or default_report_path(rulesets))
+
+    if conflicted and conflicts == "fail":
+        raise ConflictError(f"{conflicted} 条规则被其它策略分组的规则覆盖")
+
+    return built
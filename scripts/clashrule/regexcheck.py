@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DOMAIN-REGEX 检查
+
+上游的 DOMAIN-REGEX 原样写入规则集时，无法编译的正则会让客户端加载规则集失败，
+回溯失控的正则会在每次匹配时拖慢内核。合并之后逐条检查：
+  - invalid：无法编译，移除
+  - slow：在模糊测试语料上的匹配耗时超出 REGEX_TIME_BUDGET，移除
+  - as_exact / as_suffix / as_keyword：与一条 DOMAIN / DOMAIN-SUFFIX / DOMAIN-KEYWORD 等价，
+    改写为对应规则，之后照常参与白名单、压缩、排除与域名集合
+
+检查结论按正则的摘要保存在 .github/cache/regex.json，之后的运行只检查新出现的正则；
+slow 取决于运行环境的耗时，不保存，每次运行重新检查，避免一次偶然的慢速运行永久移除规则。
+同一次运行内每个正则只编译、只检查一次（compile_pattern）。
+客户端的正则引擎同样基于回溯，这里以 Python re 的编译结果与耗时作为近似。
+"""
+
+import hashlib
+import json
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from .store import EXACT, KEYWORD, REGEX, STORE, SUFFIX, RuleStore
+from .writer import write_bytes
+
+REGEX_CACHE_NAME = "regex.json"
+
+# 检查逻辑或模糊测试语料变化时递增，使缓存的结论失效（REGEX_TIME_BUDGET 变化时自动失效）
+REGEX_CHECK_VERSION = 1
+
+# 单条正则在整个语料上的匹配耗时上限（秒）
+REGEX_TIME_BUDGET = 0.05
+
+CHECKS = {
+    "invalid": "无法编译而移除",
+    "slow": "匹配耗时超出预算而移除",
+    "as_exact": "改写为 DOMAIN",
+    "as_suffix": "改写为 DOMAIN-SUFFIX",
+    "as_keyword": "改写为 DOMAIN-KEYWORD",
+}
+
+# 只由域名字符与转义的 "." / "-" 组成的正则片段，即一段字面量
+_LITERAL = r"(?:[a-z0-9_-]|\\[.-])+"
+
+# 改写类别 -> (等价的规则类型, 整条正则的形式)；分组 1 为字面量
+_REWRITES = {
+    "as_exact": (EXACT, re.compile(rf"\^({_LITERAL})\$")),
+    # (^|\.)example\.com$、^(.*\.)?example\.com$、^(?:.+\.)?example\.com$
+    "as_suffix": (SUFFIX, re.compile(
+        rf"(?:\((?:\?:)?\^\|\\\.\)|\^\((?:\?:)?\.[*+]\\\.\)\?)({_LITERAL})\$"
+    )),
+    # 不带锚点的字面量，或 .*ads.*
+    "as_keyword": (KEYWORD, re.compile(rf"(?:\.\*)?({_LITERAL})(?:\.\*)?")),
+}
+
+# 模糊测试语料按长度逐级加长，每次匹配后检查累计耗时，超出预算即停止；
+# 长度逐个字符增加，指数回溯的正则最后一次匹配的耗时不会远超预算
+_FUZZ_LENGTHS = (*range(4, 25), 32)
+_FUZZ_ALPHABET = "a0.-"
+_FUZZ_DOMAINS = (
+    "example.com",
+    "www.example.com",
+    "ads.tracker.example.co.uk",
+    "a-b-c-d-e-f.g-h-i-j.example.net",
+)
+
+
+@lru_cache(maxsize=None)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """编译 DOMAIN-REGEX 的值，结果在本次运行内复用；无法编译时抛出 re.error"""
+    return re.compile(pattern)
+
+
+def rewrite_pattern(pattern: str) -> Optional[tuple[str, int, str]]:
+    """正则等价于一条非正则规则时返回 (改写类别, 规则类型, 值)，否则返回 None"""
+    for key, (rule_type, form) in _REWRITES.items():
+        m = form.fullmatch(pattern)
+        if m:
+            return key, rule_type, m[1].replace("\\", "")
+    return None
+
+
+def fuzz_corpus(pattern: str) -> list[list[str]]:
+    """
+    按长度分级的语料：正则中出现的字面字符与常见域名字符各自重复到指定长度，
+    末尾追加一个无法匹配的字符，迫使回溯走完全部分支。
+    """
+    alphabet = dict.fromkeys(c for c in pattern.lower() if c.isalnum() or c in ".-")
+    alphabet.update(dict.fromkeys(_FUZZ_ALPHABET))
+    chars = list(alphabet)[:8]
+    mixed = "".join(chars)
+
+    levels = [list(_FUZZ_DOMAINS)]
+    for n in _FUZZ_LENGTHS:
+        level = [c * n + "!" for c in chars]
+        level.append((mixed * n)[:n] + "!")
+        level.append(".".join(["a" * 2] * (n // 3)) + "!")
+        levels.append(level)
+    return levels
+
+
+def too_slow(compiled: re.Pattern, budget: float = REGEX_TIME_BUDGET) -> bool:
+    deadline = time.perf_counter() + budget
+    for level in fuzz_corpus(compiled.pattern):
+        for text in level:
+            compiled.search(text)
+            if time.perf_counter() > deadline:
+                return True
+    return False
+
+
+def check_pattern(pattern: str) -> tuple[str, str]:
+    """返回 (类别, 详情)：类别为 CHECKS 中的一项，或正常时为 "ok"；改写时详情为改写后的值"""
+    rewrite = rewrite_pattern(pattern)
+    if rewrite is not None:
+        return rewrite[0], rewrite[2]
+    try:
+        compiled = compile_pattern(pattern)
+    except re.error as e:
+        return "invalid", str(e)
+    if too_slow(compiled):
+        return "slow", ""
+    return "ok", ""
+
+
+def _key(pattern: str) -> str:
+    return hashlib.sha1(f"{REGEX_CHECK_VERSION}:{REGEX_TIME_BUDGET}:{pattern}".encode("utf-8")).hexdigest()
+
+
+class RegexChecker:
+    """
+    检查结论的持久化缓存；path 为 None 时只在内存中缓存。
+    slow 结论只在本次运行内缓存，不写入文件；旧缓存中的 slow 结论在加载时丢弃。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.verdicts: dict[str, list[str]] = {}
+        self.slow: set[str] = set()
+        self.dirty = False
+        if path is not None and path.exists():
+            try:
+                self.verdicts = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self.verdicts = {}
+        cached = len(self.verdicts)
+        self.verdicts = {k: v for k, v in self.verdicts.items() if v[0] != "slow"}
+        self.dirty = len(self.verdicts) != cached
+
+    def check(self, pattern: str) -> tuple[str, str]:
+        key = _key(pattern)
+        if key in self.slow:
+            return "slow", ""
+        verdict = self.verdicts.get(key)
+        if verdict is None:
+            verdict = list(check_pattern(pattern))
+            if verdict[0] == "slow":
+                self.slow.add(key)
+            else:
+                self.verdicts[key] = verdict
+                self.dirty = True
+        return verdict[0], verdict[1]
+
+    def save(self) -> None:
+        if self.path is None or not self.dirty:
+            return
+        write_bytes(self.path, json.dumps(self.verdicts, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        self.dirty = False
+
+
+def check_regexes(
+    rules: dict[int, str],
+    checker: RegexChecker,
+    store: RuleStore = STORE,
+) -> tuple[dict[int, str], dict[str, list[str]]]:
+    """
+    返回 (检查后的规则, 类别 -> 原正则)，只列出实际出现过的类别；规则以 ID 表示。
+    改写的规则换成新规则 ID，保留原来源与位置；改写结果与已有规则重复时保留先出现的一条。
+    """
+    types, values = store.types, store.values
+    if not any(types[r] == REGEX for r in rules):
+        return rules, {}
+
+    kept: dict[int, str] = {}
+    found: dict[str, list[str]] = {}
+    for r, src in rules.items():
+        if types[r] != REGEX:
+            kept.setdefault(r, src)
+            continue
+
+        pattern = values[r]
+        verdict, detail = checker.check(pattern)
+        if verdict == "ok":
+            kept.setdefault(r, src)
+            continue
+
+        found.setdefault(verdict, []).append(pattern)
+        if verdict in _REWRITES:
+            kept.setdefault(store.add(_REWRITES[verdict][0], detail), src)
+
+    return kept, {key: found[key] for key in CHECKS if key in found}
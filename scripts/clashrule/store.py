@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规则表
+
+pipeline 内部不再保存 "DOMAIN-SUFFIX,foo.example.com" 这样的完整字符串，
+而是把每条不同的规则登记一次，之后只传递整数 ID：
+  - 规则类型保存在 array("B") 中，每条 1 字节
+  - 值保存一份，同类型下相同的值只对应一个 ID；多个来源、排除源、索引都共享同一个字符串对象
+  - 规则集合是 ID 的有序 dict / set，合并、排除、比较都是整数集合运算
+
+完整字符串只在写出文件、保存快照时临时生成。
+"""
+
+import threading
+from array import array
+from enum import IntEnum
+from typing import Iterable, Optional
+
+
+class RuleType(IntEnum):
+    DOMAIN_SUFFIX = 0
+    DOMAIN = 1
+    DOMAIN_KEYWORD = 2
+    DOMAIN_REGEX = 3
+
+    @property
+    def label(self) -> str:
+        return self.name.replace("_", "-")
+
+
+LABELS = tuple(t.label for t in RuleType)
+TYPE_IDS = {t.label: int(t) for t in RuleType}
+
+# 供热点循环直接与 store.types[i] 比较，避免构造枚举对象
+SUFFIX = int(RuleType.DOMAIN_SUFFIX)
+EXACT = int(RuleType.DOMAIN)
+KEYWORD = int(RuleType.DOMAIN_KEYWORD)
+REGEX = int(RuleType.DOMAIN_REGEX)
+
+
+class RuleStore:
+    """
+    只增不减的规则表，ID 从 0 开始连续分配。
+
+    下载线程会并发登记解析结果，登记时加锁；读取不加锁（只读取已分配的 ID）。
+    types 的顺序与 config.RULE_TYPES 一致。
+    """
+
+    def __init__(self):
+        self.types = array("B")
+        self.values: list[str] = []
+        self._ids: tuple[dict[str, int], ...] = tuple({} for _ in RuleType)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _add(self, rule_type: int, value: str) -> int:
+        ids = self._ids[rule_type]
+        rid = ids.get(value)
+        if rid is None:
+            rid = ids[value] = len(self.values)
+            self.values.append(value)
+            self.types.append(rule_type)
+        return rid
+
+    def add(self, rule_type: int, value: str) -> int:
+        with self._lock:
+            return self._add(rule_type, value)
+
+    def add_values(self, rule_type: int, values: Iterable[str]) -> list[int]:
+        """登记同一类型的一批值，返回对应的 ID"""
+        with self._lock:
+            return [self._add(rule_type, v) for v in values]
+
+    def add_rules(self, rules: Iterable[str]) -> dict[int, None]:
+        """登记一批 "类型,值" 字符串，返回保持原顺序的 ID 有序集合"""
+        result: dict[int, None] = {}
+        with self._lock:
+            for rule in rules:
+                rule_type, value = rule.split(",", 1)
+                result[self._add(TYPE_IDS[rule_type], value)] = None
+        return result
+
+    def find(self, rule_type: int, value: str) -> Optional[int]:
+        return self._ids[rule_type].get(value)
+
+    def find_rule(self, rule: str) -> Optional[int]:
+        rule_type, _, value = rule.partition(",")
+        t = TYPE_IDS.get(rule_type)
+        return None if t is None else self._ids[t].get(value)
+
+    def rule(self, rid: int) -> str:
+        return f"{LABELS[self.types[rid]]},{self.values[rid]}"
+
+    def rules(self, ids: Iterable[int]) -> list[str]:
+        types, values = self.types, self.values
+        return [f"{LABELS[types[i]]},{values[i]}" for i in ids]
+
+
+# 一次构建中所有模块共用的规则表
+STORE = RuleStore()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+域名后缀索引
+
+按 Clash 匹配语义判断一条规则是否已被覆盖：
+  - DOMAIN-SUFFIX,example.com 覆盖 example.com 及其全部子域名
+  - DOMAIN,example.com 只覆盖 example.com 本身
+  - DOMAIN-KEYWORD,ad 覆盖值中含 "ad" 的 DOMAIN / DOMAIN-SUFFIX，以及包含它的更长关键字
+  - DOMAIN-REGEX 只做精确匹配
+
+索引保存规则表（store.RuleStore）中的 ID；后缀以哈希集合保存，查询时逐级去掉
+最左侧标签，单次查询耗时只与标签数有关，整体对规则数量是线性的；关键字较少时编译为一个正则整体查找，
+较多时使用 Aho-Corasick 自动机，查找耗时只与文本长度有关。
+"""
+
+import re
+from collections import deque
+from typing import Collection, Iterable, Iterator, Optional
+
+from .store import EXACT, KEYWORD, STORE, SUFFIX, RuleStore
+
+
+def parent_suffixes(domain: str) -> Iterable[str]:
+    """依次返回 a.b.example.com 的父级后缀：b.example.com、example.com、com"""
+    i = domain.find(".")
+    while i >= 0:
+        domain = domain[i + 1:]
+        yield domain
+        i = domain.find(".")
+
+
+# 正则的多选分支在每个位置逐一尝试，关键字超过该数量时改用 Aho-Corasick
+REGEX_KEYWORDS_MAX = 64
+
+
+class Automaton:
+    """Aho-Corasick 自动机：一次扫描文本找出其中出现的全部关键字"""
+
+    def __init__(self, words: Iterable[str]):
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        # 以该状态结尾的关键字，以及沿失败链最近的另一个关键字结尾状态
+        self.output: list[Optional[str]] = [None]
+        self.link: list[int] = [0]
+
+        for word in words:
+            state = 0
+            for c in word:
+                nxt = self.goto[state].get(c)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][c] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(None)
+                    self.link.append(0)
+                state = nxt
+            self.output[state] = word
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                f = self.goto[f].get(c, 0)
+                self.fail[nxt] = f
+                self.link[nxt] = f if self.output[f] is not None else self.link[f]
+
+    def __len__(self) -> int:
+        return len(self.goto)
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, str]]:
+        """依次返回 (结束位置, 关键字)，同一位置结束的关键字由长到短"""
+        goto, fail, output, link = self.goto, self.fail, self.output, self.link
+        state = 0
+        for i, c in enumerate(text):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            s = state if output[state] is not None else link[state]
+            while s:
+                yield i, output[s]
+                s = link[s]
+
+    def search(self, text: str) -> Optional[str]:
+        return next((word for _, word in self.iter_matches(text)), None)
+
+
+class KeywordIndex:
+    """
+    DOMAIN-KEYWORD 索引。
+
+    只收录全小写的关键字：域名值已统一小写，含大写字母的关键字是否命中取决于客户端实现，
+    不据此判定覆盖。
+    """
+
+    def __init__(self, keywords: Iterable[str] = ()):
+        self.keywords = sorted({k for k in keywords if k == k.lower()}, key=lambda k: (len(k), k))
+        self._pattern = None
+        self._automaton = None
+        if len(self.keywords) > REGEX_KEYWORDS_MAX:
+            self._automaton = Automaton(self.keywords)
+        elif self.keywords:
+            self._pattern = re.compile("|".join(map(re.escape, self.keywords)))
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def search(self, text: str) -> Optional[str]:
+        """返回 text 中出现的任一关键字"""
+        if self._automaton is not None:
+            return self._automaton.search(text)
+        if self._pattern is None:
+            return None
+        m = self._pattern.search(text)
+        return m[0] if m else None
+
+    def shorter_in(self, keyword: str) -> Optional[str]:
+        """返回被 keyword 包含的另一条更短的关键字"""
+        if self._automaton is not None:
+            return next((k for _, k in self._automaton.iter_matches(keyword) if k != keyword), None)
+        for k in self.keywords:
+            if len(k) >= len(keyword):
+                return None
+            if k in keyword:
+                return k
+        return None
+
+
+class SuffixIndex:
+    """
+    规则 ID 的覆盖索引。类型与值相同的规则 ID 相同，精确匹配只需查 ID 集合；
+    后缀集合中的字符串就是规则表中的值，不另存副本。
+    """
+
+    def __init__(self, ids: Collection[int] = (), store: RuleStore = STORE):
+        # 直接引用传入的 ID 集合（通常是 BuildResult.rules），不复制；建立索引后不应再修改
+        self.store = store
+        self.ids = ids
+        types, values = store.types, store.values
+        self.suffixes: set[str] = {values[i] for i in ids if types[i] == SUFFIX}
+        self._keywords: Optional[KeywordIndex] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def keywords(self) -> KeywordIndex:
+        if self._keywords is None:
+            types, values = self.store.types, self.store.values
+            self._keywords = KeywordIndex(values[i] for i in self.ids if types[i] == KEYWORD)
+        return self._keywords
+
+    def has_suffix(self, domain: str, strict: bool = False) -> bool:
+        """domain 本身（strict 为 False 时）或任一父级后缀是否为 DOMAIN-SUFFIX"""
+        suffixes = self.suffixes
+        if not strict and domain in suffixes:
+            return True
+        return any(s in suffixes for s in parent_suffixes(domain))
+
+    def covers(self, rid: int) -> bool:
+        """判断规则是否被索引中的规则（含规则自身）覆盖"""
+        if rid in self.ids:
+            return True
+        rule_type, value = self.store.types[rid], self.store.values[rid]
+        if rule_type == SUFFIX or rule_type == EXACT:
+            return self.has_suffix(value) or self.keywords.search(value) is not None
+        return rule_type == KEYWORD and self.keywords.shorter_in(value) is not None
+
+    def covers_domain(self, rid: int) -> bool:
+        """与 covers 相同，但不考虑 DOMAIN-KEYWORD；域名集合（.yaml / .mrs）只能表达这部分覆盖"""
+        if rid in self.ids:
+            return True
+        rule_type = self.store.types[rid]
+        return (rule_type == SUFFIX or rule_type == EXACT) and self.has_suffix(self.store.values[rid])
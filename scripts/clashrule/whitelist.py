@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+白名单过滤
+
+读取 whitelist/*.list，去掉拦截规则集中会命中白名单域名的规则：
+  - DOMAIN：域名等于白名单 DOMAIN，或位于白名单 DOMAIN-SUFFIX 之下
+  - DOMAIN-SUFFIX：位于白名单 DOMAIN-SUFFIX 之下，或本身是任一白名单域名的父级后缀
+    （例如 DOMAIN-SUFFIX,com 会拦截 google.com）
+  - DOMAIN-KEYWORD：关键字出现在任一白名单域名中
+  - DOMAIN-REGEX：正则能匹配任一白名单域名
+
+域名类规则通过哈希索引逐级查父级后缀，不做规则 × 白名单的双重循环。
+"""
+
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .config import BASE_DIR, TMP_DIR
+from .parse import parse_lines, split_rule
+from .regexcheck import compile_pattern
+from .store import LABELS, STORE, RuleStore
+from .suffix import parent_suffixes
+from .writer import write_bytes
+
+WHITELIST_DIR = BASE_DIR / "whitelist"
+REPORT_FILE = TMP_DIR / "whitelist_report.txt"
+
+
+class Whitelist:
+    def __init__(self, rules: Iterable[str] = ()):
+        # 域名 -> 白名单规则，用于定位是哪一条白名单生效
+        self.exact: dict[str, str] = {}
+        self.suffixes: dict[str, str] = {}
+        # 白名单域名自身及其全部父级后缀 -> 白名单规则
+        self.ancestors: dict[str, str] = {}
+
+        for rule in rules:
+            rule_type, value = split_rule(rule)
+            if rule_type == "DOMAIN-SUFFIX":
+                self.suffixes.setdefault(value, rule)
+            elif rule_type == "DOMAIN":
+                self.exact.setdefault(value, rule)
+            else:
+                continue
+            self.ancestors.setdefault(value, rule)
+            for parent in parent_suffixes(value):
+                self.ancestors.setdefault(parent, rule)
+
+        # 关键字 / 正则一次性在拼接后的字符串上预筛，命中后再定位具体条目
+        self.domains = sorted(self.exact.keys() | self.suffixes.keys())
+        self._joined = "\n".join(self.domains)
+
+    def __len__(self) -> int:
+        return len(self.exact) + len(self.suffixes)
+
+    @classmethod
+    def load(cls, directory: Path = WHITELIST_DIR) -> "Whitelist":
+        rules: dict[str, None] = {}
+        for path in sorted(directory.glob("*.list")):
+            with path.open("r", encoding="utf-8", errors="ignore") as f:
+                parse_lines(f, types=("DOMAIN-SUFFIX", "DOMAIN"), rules=rules)
+        return cls(rules)
+
+    def _covering_suffix(self, domain: str) -> Optional[str]:
+        if domain in self.suffixes:
+            return self.suffixes[domain]
+        for parent in parent_suffixes(domain):
+            if parent in self.suffixes:
+                return self.suffixes[parent]
+        return None
+
+    def _owner(self, domain: str) -> str:
+        return self.exact.get(domain) or self.suffixes[domain]
+
+    def match(self, rule: str) -> Optional[str]:
+        """返回使该规则被移除的白名单规则，不冲突时返回 None"""
+        return self.match_value(*split_rule(rule))
+
+    def match_value(self, rule_type: str, value: str) -> Optional[str]:
+        if rule_type == "DOMAIN":
+            return self.exact.get(value) or self._covering_suffix(value)
+
+        if rule_type == "DOMAIN-SUFFIX":
+            return self._covering_suffix(value) or self.ancestors.get(value)
+
+        if rule_type == "DOMAIN-KEYWORD":
+            if value not in self._joined:
+                return None
+            for d in self.domains:
+                if value in d:
+                    return self._owner(d)
+            return None
+
+        if rule_type == "DOMAIN-REGEX":
+            try:
+                pattern = compile_pattern(value)
+            except re.error:
+                return None
+            for d in self.domains:
+                if pattern.search(d):
+                    return self._owner(d)
+            return None
+
+        return None
+
+
+def apply_whitelist(
+    rules: dict[int, str],
+    whitelist: Whitelist,
+    store: RuleStore = STORE,
+) -> tuple[dict[int, str], dict[str, list[str]]]:
+    """返回 (保留的规则, 白名单规则 -> 被其移除的规则)；传入与保留的规则以 ID 表示"""
+    kept: dict[int, str] = {}
+    hits: dict[str, list[str]] = {}
+    types, values = store.types, store.values
+
+    for r, src in rules.items():
+        owner = whitelist.match_value(LABELS[types[r]], values[r])
+        if owner is None:
+            kept[r] = src
+        else:
+            hits.setdefault(owner, []).append(store.rule(r))
+
+    return kept, hits
+
+
+def read_report(path: Path = REPORT_FILE) -> dict[str, dict[str, list[str]]]:
+    """读取 write_report 写出的报告：规则集名称 -> 白名单规则 -> 被其移除的规则"""
+    reports: dict[str, dict[str, list[str]]] = {}
+    if not path.exists():
+        return reports
+    hits: dict[str, list[str]] = {}
+    removed: list[str] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("## "):
+            hits = reports.setdefault(line[3:].split("（", 1)[0], {})
+        elif line.startswith("  - "):
+            removed.append(line[4:])
+        elif line and not line.startswith("#"):
+            removed = hits.setdefault(line, [])
+    return reports
+
+
+def _report_body(text: str) -> str:
+    """去掉更新时间行后的报告内容，用于判断报告是否变化"""
+    return "\n".join(line for line in text.splitlines() if not line.startswith("# 更新时间："))
+
+
+def write_report(reports: dict[str, dict[str, list[str]]], now: datetime, path: Path = REPORT_FILE) -> bool:
+    """
+    按规则集、白名单条目列出被移除的规则，返回是否实际写入。
+    除更新时间外内容与已有报告相同时不重写，避免只改时间戳的提交。
+    """
+    lines = [
+        "# 白名单命中报告",
+        f"# 更新时间：{now.strftime('%Y年%m月%d日 %H:%M')}（北京时间）",
+        "",
+    ]
+    for name, hits in reports.items():
+        total = sum(len(v) for v in hits.values())
+        lines.append(f"## {name}（移除 {total} 条）")
+        for owner in sorted(hits):
+            lines.append(owner)
+            lines.extend(f"  - {r}" for r in sorted(hits[owner]))
+        lines.append("")
+
+    text = "\n".join(lines).rstrip() + "\n"
+    if path.exists() and _report_body(path.read_text(encoding="utf-8")) == _report_body(text):
+        return False
+    write_bytes(path, text.encode("utf-8"))
+    return True
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式写出
+
+输出文件先写入同目录下的临时文件，完成后 os.replace 替换目标文件：
+中途出错或进程被中断时，已发布的文件保持原样，不会留下写了一半的内容。
+规则集、报告、快照与下载缓存都经由 atomic_open / write_bytes 写出。
+
+规则行按批编码后写入带缓冲的文件，不在内存中拼出整个文件；
+写入的同时计算正文摘要，用于判断内容是否与上次一致。
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, BinaryIO, Iterable, Iterator, Optional
+
+WRITE_BUFFER = 1 << 20
+BATCH_LINES = 4096
+
+
+class DiscardWrite(Exception):
+    """在 atomic_open 块内抛出以放弃本次写入，由调用方捕获"""
+
+
+@contextmanager
+def atomic_open(path: Path) -> Iterator[BinaryIO]:
+    """
+    以二进制方式打开 path 的临时文件，with 块正常结束后替换 path；
+    块内抛出异常（含 DiscardWrite）时删除临时文件，path 不变。
+    临时文件名唯一，多个线程同时写同一 path 时互不干扰，最后完成的一方生效。
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb", buffering=WRITE_BUFFER) as f:
+            yield f
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    os.replace(tmp, path)
+
+
+def write_lines(f: BinaryIO, lines: Iterable[str], digest: Optional[Any] = None) -> int:
+    """逐批写出文本行（每行追加换行），返回行数；传入 digest（hashlib 对象）时同时更新摘要"""
+    count = 0
+    batch: list[str] = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= BATCH_LINES:
+            count += _flush(f, batch, digest)
+    count += _flush(f, batch, digest)
+    return count
+
+
+def _flush(f: BinaryIO, batch: list[str], digest: Optional[Any]) -> int:
+    if not batch:
+        return 0
+    data = ("\n".join(batch) + "\n").encode("utf-8")
+    f.write(data)
+    if digest is not None:
+        digest.update(data)
+    n = len(batch)
+    batch.clear()
+    return n
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    with atomic_open(path) as f:
+        f.write(data)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+回放查询域名，统计生成的规则列表在匹配时的开销
+
+用法：
+    python scripts/simulate.py                                   # 全部 Clash/Ruleset/**/*.list
+    python scripts/simulate.py Clash/Ruleset/AD/BanAD.list --corpus domains.txt
+    python scripts/simulate.py --queries 200000 --output simulate.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from clashrule.matcher import default_lists, load_rules, simulate, synthetic_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description="规则匹配模拟与吞吐测试")
+    parser.add_argument("lists", nargs="*", type=Path, help="要测试的 .list 文件，默认全部")
+    parser.add_argument("--corpus", type=Path, help="查询域名文件，每行一个；默认按规则生成")
+    parser.add_argument("--queries", type=int, default=100_000, help="未指定 --corpus 时生成的查询数量")
+    parser.add_argument("--samples", type=int, default=10, help="输出中附带的命中示例数量")
+    parser.add_argument("--output", type=Path, help="JSON 结果输出路径")
+    args = parser.parse_args()
+
+    corpus = None
+    if args.corpus:
+        corpus = [
+            line.strip()
+            for line in args.corpus.read_text(encoding="utf-8", errors="ignore").splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+
+    reports = []
+    for path in args.lists or default_lists():
+        queries = corpus or synthetic_corpus(load_rules(path), args.queries)
+        report = simulate(path, queries, args.samples)
+        reports.append(report.to_dict())
+        print(
+            f"{path.name}: {sum(report.rules.values())} rules, "
+            f"{report.memory_bytes / 1024 / 1024:.1f} MiB, "
+            f"{report.lookups_per_sec} lookups/s, hits {report.hits}"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(reports, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote simulation results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()